@@ -1,26 +1,92 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, Query, Path
+from fastapi.responses import JSONResponse, StreamingResponse, Response, FileResponse
+from pydantic import BaseModel, conint
 from utils import NewsScraper
 import uvicorn
 from typing import List, Dict, Any, Optional
 import os
+import asyncio
+import datetime
+import json
+import threading
+import uuid
+from cache import ResultCache
+from worker_pool import BoundedWorkerPool, PoolSaturatedError
+from metrics import register_stats_gauges, render_metrics
+from history_store import HISTORY_DEFAULT_DAYS, HISTORY_DEFAULT_WINDOW
+from refresher import WatchlistRefresher, REFRESH_ENABLED
 
 app = FastAPI(title="News Sentiment and TTS API",
               description="API for news extraction, sentiment analysis, and text-to-speech generation")
 
-# Initialize news scraper
+# Initialize news scraper (the model is loaded by warmup or on first use)
 news_scraper = NewsScraper()
 
+# Recent analyses, so TTS can reuse a result instead of re-running the pipeline.
+# Kept on disk so an analysis_id issued by one uvicorn worker resolves on every
+# worker; an empty NEWS_ANALYSIS_DIR keeps them in this process only.
+analysis_store = ResultCache(ttl=float(os.environ.get("NEWS_ANALYSIS_TTL", 3600)),
+                             maxsize=int(os.environ.get("NEWS_ANALYSIS_STORE_SIZE", 256)),
+                             disk_dir=os.environ.get("NEWS_ANALYSIS_DIR", "analysis_cache") or None)
+
+# Upper bound on companies per batch request
+MAX_BATCH_COMPANIES = int(os.environ.get("NEWS_MAX_BATCH_COMPANIES", 50))
+# Upper bound on articles analyzed per company
+MAX_ARTICLES = int(os.environ.get("NEWS_MAX_ARTICLES", 20))
+
+# Blocking pipeline work runs here so the event loop stays free
+worker_pool = BoundedWorkerPool()
+
+# Cache and queue state, read on every /metrics scrape
+register_stats_gauges("news_result_cache", "Result cache", news_scraper.result_cache.stats,
+                      ["hits", "misses", "size"])
+register_stats_gauges("news_analysis_store", "Analysis store", analysis_store.stats,
+                      ["hits", "misses", "size"])
+register_stats_gauges("news_audio_store", "Audio store", news_scraper.audio_store.stats,
+                      ["hits", "misses", "entries", "bytes"])
+register_stats_gauges("news_worker_pool", "Worker pool", worker_pool.stats,
+                      ["in_flight", "queued", "rejected"])
+
+# Keeps hot companies in the result cache; started on startup when enabled
+refresher = WatchlistRefresher(news_scraper) if REFRESH_ENABLED else None
+if refresher is not None:
+    register_stats_gauges("news_refresher", "Watchlist refresher", refresher.stats, ["refreshes", "failures"])
+
+@app.on_event("startup")
+async def start_warmup():
+    # Warm up in the background so the server accepts connections immediately
+    if os.environ.get("NEWS_WARMUP_ON_STARTUP", "1") == "1":
+        threading.Thread(target=news_scraper.warmup, name="news-warmup", daemon=True).start()
+    if refresher is not None:
+        refresher.start()
+
+@app.on_event("shutdown")
+async def stop_refresher():
+    if refresher is not None:
+        refresher.stop()
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
 # Pydantic models for request/response
 class CompanyRequest(BaseModel):
     company_name: str
+    max_articles: conint(ge=1, le=MAX_ARTICLES) = 5
+    use_cache: bool = True
+    # Count every copy of a syndicated story in the distribution (default: NEWS_DEDUP_COUNT_DUPLICATES)
+    count_duplicates: Optional[bool] = None
 
 class ArticleResponse(BaseModel):
     title: str
     summary: str
     sentiment: str
+    sentiment_score: Optional[float] = None
     topics: List[str]
     url: str
+    cluster_size: int = 1
+    duplicate_of: Optional[str] = None
 
 class SentimentDistribution(BaseModel):
     Positive: int = 0
@@ -46,6 +112,132 @@ class CompanyNewsResponse(BaseModel):
     articles: List[ArticleResponse]
     comparative_sentiment_score: ComparativeAnalysis
     final_sentiment_analysis: str
+    analysis_id: Optional[str] = None
+
+class BatchCompanyRequest(BaseModel):
+    company_names: List[str]
+    max_articles: conint(ge=1, le=MAX_ARTICLES) = 5
+    use_cache: bool = True
+    count_duplicates: Optional[bool] = None
+
+class BatchCompanyNewsResponse(BaseModel):
+    results: List[CompanyNewsResponse]
+
+class TTSRequest(BaseModel):
+    company_name: Optional[str] = None
+    analysis_id: Optional[str] = None
+    result: Optional[CompanyNewsResponse] = None
+    max_articles: conint(ge=1, le=MAX_ARTICLES) = 5
+    use_cache: bool = True
+
+class TTSResponse(BaseModel):
+    audio_file: str
+    audio_id: Optional[str] = None
+    audio_url: Optional[str] = None
+    text: str
+
+class NewsSentimentTTSResponse(BaseModel):
+    analysis: CompanyNewsResponse
+    audio_file: str
+    audio_id: Optional[str] = None
+    audio_url: Optional[str] = None
+    text: str
+
+def run_analysis(company_name, max_articles=5, use_cache=True, count_duplicates=None):
+    """Run the news pipeline and remember the result under a new analysis ID"""
+    result = news_scraper.process_company_news(company_name, max_articles, use_cache=use_cache,
+                                               count_duplicates=count_duplicates)
+    result["analysis_id"] = uuid.uuid4().hex
+    analysis_store.set(result["analysis_id"], result)
+    return result
+
+def run_batch_analysis(company_names, max_articles=5, use_cache=True, count_duplicates=None):
+    """Run the shared multi-company pipeline and remember each result"""
+    results = news_scraper.process_companies(company_names, max_articles, use_cache=use_cache,
+                                             count_duplicates=count_duplicates)
+    for result in results:
+        result["analysis_id"] = uuid.uuid4().hex
+        analysis_store.set(result["analysis_id"], result)
+    return results
+
+def format_stream_event(event, stream_format):
+    """Encode a pipeline event as an NDJSON line or a server-sent event"""
+    data = json.dumps(event, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+def iterate_on_pool(items, error_item=None):
+    """
+    Drain the blocking iterator items on the worker pool.
+    Returns an async iterator of its items; raises PoolSaturatedError up front
+    so overload is reported before the response starts. If items raises, the
+    stream ends after error_item(exception), when given.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+    
+    def produce():
+        try:
+            for item in items:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            print(f"Error in streamed response: {e}")
+            if error_item is not None:
+                loop.call_soon_threadsafe(queue.put_nowait, error_item(e))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+    
+    worker_pool.submit(produce)
+    
+    async def drain():
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            yield item
+    
+    return drain()
+
+def start_stream(company_name, max_articles=5, use_cache=True, count_duplicates=None):
+    """
+    Start streaming a company's analysis on the worker pool.
+    Returns an async iterator of events; raises PoolSaturatedError up front
+    so overload is reported before the response starts.
+    """
+    def events():
+        for event in news_scraper.iter_company_news(company_name, max_articles, use_cache, count_duplicates):
+            if event["event"] == "comparative_analysis":
+                # Remember the assembled result so TTS can reuse it
+                result = {"company": event["company"], "articles": event["articles"],
+                          "comparative_sentiment_score": event["comparative_sentiment_score"],
+                          "final_sentiment_analysis": event["final_sentiment_analysis"],
+                          "analysis_id": uuid.uuid4().hex}
+                analysis_store.set(result["analysis_id"], result)
+                event = dict(event, analysis_id=result["analysis_id"])
+            yield event
+    
+    return iterate_on_pool(events(), lambda e: {"event": "error", "detail": str(e)})
+
+def synthesize_summary(result):
+    """Generate Hindi TTS for an already computed news result"""
+    # Create a summary text for TTS
+    summary_text = news_scraper.build_tts_summary(result)
+    
+    # Generate TTS into the shared audio store
+    tts_file = news_scraper.text_to_hindi_speech(summary_text)
+    
+    audio_id = os.path.splitext(os.path.basename(tts_file))[0]
+    return {"audio_file": tts_file, "audio_id": audio_id, "audio_url": f"/api/audio/{audio_id}",
+            "text": summary_text}
+
+def analyze_and_synthesize(company_name, max_articles=5, use_cache=True, result=None, count_duplicates=None):
+    """Run the pipeline if no result is given, then synthesize its summary"""
+    if result is None:
+        result = run_analysis(company_name, max_articles, use_cache, count_duplicates)
+    speech = synthesize_summary(result)
+    return {"analysis": result, **speech}
 
 @app.post("/api/news_sentiment", response_model=CompanyNewsResponse)
 async def get_news_sentiment(request: CompanyRequest):
@@ -53,33 +245,224 @@ async def get_news_sentiment(request: CompanyRequest):
     Get news sentiment analysis for a company
     """
     try:
-        result = news_scraper.process_company_news(request.company_name)
-        return result
+        return await worker_pool.run(run_analysis, request.company_name, request.max_articles,
+                                     request.use_cache, request.count_duplicates)
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/news_sentiment/stream")
+async def stream_news_sentiment(request: CompanyRequest,
+                                format: str = Query("ndjson", regex="^(ndjson|sse)$")):
+    """
+    Stream news sentiment analysis for a company.
+    Each article is sent as soon as it is scored, followed by the
+    comparative analysis as the final event. format is ndjson or sse.
+    """
+    events = start_stream(request.company_name, request.max_articles, request.use_cache,
+                          request.count_duplicates)
+    
+    async def body():
+        async for event in events:
+            yield format_stream_event(event, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+@app.post("/api/news_sentiment/batch", response_model=BatchCompanyNewsResponse)
+async def get_batch_news_sentiment(request: BatchCompanyRequest):
+    """
+    Get news sentiment analysis for several companies in one pipeline run.
+    Articles shared between companies are fetched and scored once.
+    """
+    if not request.company_names:
+        raise HTTPException(status_code=422, detail="company_names must not be empty")
+    if len(request.company_names) > MAX_BATCH_COMPANIES:
+        raise HTTPException(status_code=422,
+                            detail=f"At most {MAX_BATCH_COMPANIES} companies per batch request")
+    try:
+        results = await worker_pool.run(run_batch_analysis, request.company_names,
+                                        request.max_articles, request.use_cache, request.count_duplicates)
+        return {"results": results}
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/text_to_speech")
-async def generate_speech(request: CompanyRequest):
+@app.get("/api/ready")
+async def get_readiness():
+    """
+    Readiness probe: 200 once the model and NLTK data are warmed up, 503 before
+    """
+    status = news_scraper.readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """
+    Get hit/miss counters for the news analysis result cache
+    """
+    return news_scraper.result_cache.stats()
+
+@app.get("/api/refresh/stats")
+async def get_refresh_stats():
+    """
+    Get the watchlist refresh schedule, freshness bound and last refresh times
+    """
+    if refresher is None:
+        return {"enabled": False}
+    return {"enabled": True, **refresher.stats()}
+
+@app.get("/api/search/stats")
+async def get_search_stats():
+    """
+    Get answered, failed and timed-out counts for each news search provider
+    """
+    return news_scraper.search.stats()
+
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    """
+    Get running, queued and rejected job counts for the worker pool
+    """
+    return worker_pool.stats()
+
+def get_history_store():
+    if news_scraper.history is None:
+        raise HTTPException(status_code=404, detail="Sentiment history is disabled")
+    return news_scraper.history
+
+def parse_history_end(end):
+    """Validate an end date query parameter; the regex alone admits dates like 2024-02-30"""
+    if end is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(end).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid end date: {end}")
+
+# History queries are blocking SQLite reads, so these endpoints run in FastAPI's threadpool
+@app.get("/api/history")
+def get_history_companies():
+    """
+    List companies with recorded sentiment history
+    """
+    return {"companies": get_history_store().companies()}
+
+@app.get("/api/history/{company_name}")
+def get_sentiment_history(company_name: str,
+                          days: int = Query(HISTORY_DEFAULT_DAYS, ge=1, le=3650),
+                          window: int = Query(HISTORY_DEFAULT_WINDOW, ge=1, le=365),
+                          end: Optional[str] = Query(None, regex=r"^\d{4}-\d{2}-\d{2}$")):
+    """
+    Daily sentiment for a company with rolling aggregates over the preceding window days
+    """
+    return get_history_store().series(company_name, days, window, parse_history_end(end))
+
+@app.get("/api/history/{company_name}/summary")
+def get_sentiment_summary(company_name: str,
+                          days: int = Query(HISTORY_DEFAULT_WINDOW, ge=1, le=3650),
+                          end: Optional[str] = Query(None, regex=r"^\d{4}-\d{2}-\d{2}$")):
+    """
+    Sentiment totals for a company over the last days days
+    """
+    return get_history_store().summary(company_name, days, parse_history_end(end))
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, fallback and
+    error counters, and cache and worker pool gauges
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+def resolve_tts_result(request):
+    """Return the result a TTS request refers to, or None if the pipeline must run first"""
+    if request.result is not None:
+        result = request.result.dict()
+    elif request.analysis_id:
+        result = analysis_store.get(request.analysis_id)
+        if result is None and not request.company_name:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired analysis_id: {request.analysis_id}")
+    else:
+        result = None
+    
+    if result is None and not request.company_name:
+        raise HTTPException(status_code=422, detail="Provide company_name, analysis_id or result")
+    return result
+
+@app.post("/api/text_to_speech", response_model=TTSResponse)
+async def generate_speech(request: TTSRequest):
+    """
+    Generate Hindi TTS for company news summary.
+    Uses the given result payload or analysis_id when present and only
+    runs the news pipeline when just a company name is given.
+    """
+    result = resolve_tts_result(request)
+    try:
+        output = await worker_pool.run(analyze_and_synthesize, request.company_name,
+                                       request.max_articles, request.use_cache, result)
+        output.pop("analysis")
+        return output
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/text_to_speech/stream")
+async def stream_speech(request: TTSRequest):
+    """
+    Stream Hindi TTS audio for a company news summary. Longer narrations are
+    synthesized in parallel sentence chunks and audio starts with the first chunk.
+    Synthesis runs on the worker pool, so it is subject to the same admission limit.
+    """
+    result = resolve_tts_result(request)
+    try:
+        if result is None:
+            result = await worker_pool.run(run_analysis, request.company_name,
+                                           request.max_articles, request.use_cache)
+        summary_text = news_scraper.build_tts_summary(result)
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(iterate_on_pool(news_scraper.iter_hindi_speech(summary_text)),
+                             media_type=news_scraper.tts_backend.media_type)
+
+# Audio IDs are content addresses, so an ID always names the same narration
+AUDIO_CACHE_CONTROL = f"public, max-age={int(os.environ.get('NEWS_AUDIO_MAX_AGE', 86400))}"
+
+@app.get("/api/audio/{audio_id}")
+async def get_audio(request: Request, audio_id: str = Path(..., regex="^[0-9a-f]{64}$")):
+    """
+    Serve stored audio by ID. The file is streamed from disk in blocks (never
+    loaded whole), with Range requests, ETag revalidation and cache headers.
+    """
+    path = news_scraper.audio_store.path_for(audio_id)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise HTTPException(status_code=404, detail=f"Unknown or evicted audio: {audio_id}")
+    # Re-synthesis after eviction can produce different bytes, so the validator covers the file too
+    etag = f'"{audio_id[:16]}-{stat.st_size}-{int(stat.st_mtime)}"'
+    headers = {"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=news_scraper.tts_backend.media_type, headers=headers, stat_result=stat)
+
+@app.post("/api/news_sentiment_tts", response_model=NewsSentimentTTSResponse)
+async def get_news_sentiment_with_speech(request: CompanyRequest):
     """
-    Generate Hindi TTS for company news summary
+    Get news sentiment analysis and its Hindi TTS from a single pipeline run
     """
     try:
-        # First get the news sentiment
-        result = news_scraper.process_company_news(request.company_name)
-        
-        # Create a summary text for TTS
-        summary_text = f"Company: {result['company']}. "
-        summary_text += f"Overall sentiment: {result['final_sentiment_analysis']} "
-        
-        # Add top 3 article summaries
-        for i, article in enumerate(result['articles'][:3]):
-            summary_text += f"Article {i+1}: {article['title']}. {article['summary']} "
-        
-        # Generate TTS
-        output_file = f"{request.company_name.replace(' ', '_')}_summary.mp3"
-        tts_file = news_scraper.text_to_hindi_speech(summary_text, output_file)
-        
-        return {"audio_file": tts_file, "text": summary_text}
+        return await worker_pool.run(analyze_and_synthesize, request.company_name,
+                                     request.max_articles, request.use_cache,
+                                     count_duplicates=request.count_duplicates)
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 import json
-import base64
 import os
 import time
 from utils import NewsScraper
+from refresher import WatchlistRefresher, REFRESH_ENABLED
 import threading
 
 # Set page configuration
@@ -17,7 +17,12 @@ st.set_page_config(
 # Initialize news scraper (only once)
 @st.cache_resource
 def get_news_scraper():
-    return NewsScraper()
+    scraper = NewsScraper()
+    scraper.warmup()
+    # Keep the popular companies warm in this process's result cache
+    if REFRESH_ENABLED:
+        WatchlistRefresher(scraper).start()
+    return scraper
 
 news_scraper = get_news_scraper()
 
@@ -28,12 +33,20 @@ This application analyzes news sentiment for a company and generates a text-to-s
 Enter a company name to see sentiment analysis across multiple news sources.
 """)
 
+# When set, the browser fetches audio from this API's /api/audio endpoint, which
+# must share this app's audio store directory (NEWS_AUDIO_DIR)
+API_BASE_URL = os.environ.get("NEWS_API_URL", "").rstrip("/")
+
 # Helper functions
-def get_audio_player(audio_file):
-    """Return HTML for audio player"""
-    audio_bytes = open(audio_file, 'rb').read()
-    audio_b64 = base64.b64encode(audio_bytes).decode()
-    return f'<audio controls><source src="data:audio/mp3;base64,{audio_b64}" type="audio/mp3"></audio>'
+def render_audio_player(audio_file):
+    """Show an audio player for a stored narration, served by the API if configured"""
+    if API_BASE_URL:
+        audio_id = os.path.splitext(os.path.basename(audio_file))[0]
+        st.markdown(f'<audio controls preload="metadata" src="{API_BASE_URL}/api/audio/{audio_id}"></audio>',
+                    unsafe_allow_html=True)
+    else:
+        # Streamlit serves the file from its own media endpoint
+        st.audio(audio_file, format=news_scraper.tts_backend.media_type)
 
 def get_sentiment_color(sentiment):
     """Return color based on sentiment"""
@@ -45,24 +58,25 @@ def get_sentiment_color(sentiment):
         return "gray"
 
 # Direct API functions
-def get_news_sentiment(company_name):
-    """Call the news scraper directly instead of via API"""
-    result = news_scraper.process_company_news(company_name)
-    return result
+def stream_news_sentiment(company_name, use_cache=True):
+    """Stream article and comparative analysis events from the news scraper"""
+    return news_scraper.iter_company_news(company_name, use_cache=use_cache)
+
+def render_article(index, article):
+    """Render one analyzed article as an expander"""
+    with st.expander(f"{index}. {article['title']} ({article['sentiment']})"):
+        st.markdown(f"**Summary:** {article['summary']}")
+        st.markdown(f"**Topics:** {', '.join(article['topics'])}")
+        st.markdown(f"**Sentiment:** <span style='color:{get_sentiment_color(article['sentiment'])}'>{article['sentiment']}</span>", unsafe_allow_html=True)
+        st.markdown(f"[Read full article]({article['url']})")
 
 def generate_speech(company_name, result):
     """Generate Hindi TTS for company news summary"""
     # Create a summary text for TTS
-    summary_text = f"Company: {result['company']}. "
-    summary_text += f"Overall sentiment: {result['final_sentiment_analysis']} "
-    
-    # Add top 3 article summaries
-    for i, article in enumerate(result['articles'][:3]):
-        summary_text += f"Article {i+1}: {article['title']}. {article['summary']} "
+    summary_text = news_scraper.build_tts_summary(result)
     
-    # Generate TTS
-    output_file = f"{company_name.replace(' ', '_')}_summary.mp3"
-    tts_file = news_scraper.text_to_hindi_speech(summary_text, output_file)
+    # Generate TTS into the shared audio store
+    tts_file = news_scraper.text_to_hindi_speech(summary_text)
     
     return {"audio_file": tts_file, "text": summary_text}
 
@@ -75,44 +89,59 @@ custom_company = st.text_input("Or enter a custom company name:")
 if custom_company:
     company_name = custom_company
 
+refresh_results = st.checkbox("Ignore cached results", value=False)
+
 # Create a layout with columns
 col1, col2 = st.columns([2, 1])
 
 # Process button
 if st.button("Analyze News Sentiment"):
-    # Show loading spinner
-    with st.spinner("Fetching and analyzing news articles..."):
-        try:
-            # Call news sentiment function directly
-            result = get_news_sentiment(company_name)
+    try:
+        # Lay out the first column so articles can be added as they arrive
+        with col1:
+            st.subheader(f"News Analysis for {company_name}")
+            chart_placeholder = st.empty()
+            overall_placeholder = st.empty()
+            st.markdown("### News Articles")
+            status_placeholder = st.empty()
+            status_placeholder.info("Fetching and analyzing news articles...")
+        
+        # Render each article as soon as it is scored
+        articles = []
+        summary = None
+        for event in stream_news_sentiment(company_name, use_cache=not refresh_results):
+            if event["event"] == "article":
+                articles.append(event["article"])
+                with col1:
+                    render_article(len(articles), event["article"])
+            elif event["event"] == "comparative_analysis":
+                summary = event
+        status_placeholder.empty()
+        
+        if summary is not None:
+            result = {
+                "company": summary["company"],
+                # The final event carries the articles with their near-duplicate clusters resolved
+                "articles": summary["articles"],
+                "comparative_sentiment_score": summary["comparative_sentiment_score"],
+                "final_sentiment_analysis": summary["final_sentiment_analysis"]
+            }
             
-            # Display results in the first column
-            with col1:
-                st.subheader(f"News Analysis for {result['company']}")
-                
-                # Display sentiment distribution
-                sentiment_dist = result['comparative_sentiment_score']['sentiment_distribution']
-                
-                # Create sentiment distribution chart
-                sentiment_df = pd.DataFrame({
-                    'Sentiment': list(sentiment_dist.keys()),
-                    'Count': list(sentiment_dist.values())
-                })
-                
-                st.bar_chart(sentiment_df.set_index('Sentiment'))
-                
-                # Display final sentiment analysis
+            # Display sentiment distribution
+            sentiment_dist = result['comparative_sentiment_score']['sentiment_distribution']
+            
+            # Create sentiment distribution chart
+            sentiment_df = pd.DataFrame({
+                'Sentiment': list(sentiment_dist.keys()),
+                'Count': list(sentiment_dist.values())
+            })
+            
+            chart_placeholder.bar_chart(sentiment_df.set_index('Sentiment'))
+            
+            # Display final sentiment analysis
+            with overall_placeholder.container():
                 st.markdown(f"### Overall Sentiment")
                 st.markdown(f"**{result['final_sentiment_analysis']}**")
-                
-                # Display news articles
-                st.markdown("### News Articles")
-                for i, article in enumerate(result['articles']):
-                    with st.expander(f"{i+1}. {article['title']} ({article['sentiment']})"):
-                        st.markdown(f"**Summary:** {article['summary']}")
-                        st.markdown(f"**Topics:** {', '.join(article['topics'])}")
-                        st.markdown(f"**Sentiment:** <span style='color:{get_sentiment_color(article['sentiment'])}'>{article['sentiment']}</span>", unsafe_allow_html=True)
-                        st.markdown(f"[Read full article]({article['url']})")
             
             # Display comparative analysis in the second column
             with col2:
@@ -146,13 +175,13 @@ if st.button("Analyze News Sentiment"):
                     tts_result = generate_speech(company_name, result)
                     
                     st.markdown("#### Audio Summary")
-                    st.markdown(get_audio_player(tts_result['audio_file']), unsafe_allow_html=True)
+                    render_audio_player(tts_result['audio_file'])
                     
                     with st.expander("Show Text Summary"):
                         st.markdown(tts_result['text'])
-                
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
+    
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
 
 # Add information about JSON output structure
 with st.expander("View Sample JSON Output Structure"):
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Article store defaults, overridable from the environment
+ARTICLE_DB_PATH = os.environ.get("NEWS_ARTICLE_DB", "articles.db")
+ARTICLE_MAX_AGE_SECONDS = float(os.environ.get("NEWS_ARTICLE_MAX_AGE", 7 * 24 * 3600))
+
+# Query parameters that only track the visitor and never change the content
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid", "taid", "ref")
+
+
+def canonical_url(url):
+    """
+    Normalize a URL so trivially different links to the same article share a key:
+    lowercase scheme and host, no default port, fragment or tracking parameters,
+    sorted query and no trailing slash
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except (AttributeError, ValueError):
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)) else None
+    netloc = f"{host}:{port}" if port else host
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
+
+
+def content_hash(text):
+    """Return a stable hash of article text"""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """
+    SQLite store of extracted articles and their analysis results.
+    Articles are keyed by canonical URL; analyses are additionally keyed by
+    the analysis version and are only valid for the content hash they were
+    computed from.
+    """
+
+    def __init__(self, path=ARTICLE_DB_PATH, max_age=ARTICLE_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    canonical_url TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    title TEXT,
+                    text TEXT,
+                    summary TEXT,
+                    keywords TEXT,
+                    publish_date TEXT,
+                    fetched_at REAL NOT NULL
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    canonical_url TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    sentiment_score REAL,
+                    topics TEXT NOT NULL,
+                    analyzed_at REAL NOT NULL,
+                    PRIMARY KEY (canonical_url, version)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_content_hash ON articles (content_hash)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get_article(self, url):
+        """Return stored article data for url, or None if unknown or too old"""
+        row = self._connect().execute(
+            "SELECT title, text, summary, keywords, publish_date, content_hash, fetched_at "
+            "FROM articles WHERE canonical_url = ?", (canonical_url(url),)).fetchone()
+        if row is None or (self.max_age and row[6] < time.time() - self.max_age):
+            return None
+        return {
+            "title": row[0],
+            "summary": row[2],
+            "url": url,
+            "text": row[1],
+            "keywords": json.loads(row[3] or "[]"),
+            "publish_date": row[4],
+            "content_hash": row[5]
+        }
+
+    def put_article(self, url, data):
+        """Store extracted article data for url"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articles (canonical_url, url, content_hash, title, text, summary, "
+                "keywords, publish_date, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (canonical_url(url), url, data.get("content_hash") or content_hash(data.get("text")),
+                 data.get("title"), data.get("text"), data.get("summary"),
+                 json.dumps(list(data.get("keywords") or [])), data.get("publish_date"), time.time()))
+
+    def get_analyses(self, items, version):
+        """
+        Look up stored analyses for (url, content_hash) pairs.
+        Returns {url: {"sentiment", "sentiment_score", "topics"}} for the hits.
+        """
+        items = list(items)
+        if not items:
+            return {}
+        keys = {canonical_url(url): (url, digest) for url, digest in items}
+        placeholders = ",".join("?" * len(keys))
+        rows = self._connect().execute(
+            f"SELECT canonical_url, content_hash, sentiment, sentiment_score, topics FROM analyses "
+            f"WHERE version = ? AND canonical_url IN ({placeholders})", [version, *keys]).fetchall()
+        found = {}
+        for key, digest, sentiment, score, topics in rows:
+            url, expected = keys[key]
+            if digest == expected:
+                found[url] = {"sentiment": sentiment, "sentiment_score": score, "topics": json.loads(topics)}
+        return found
+
+    def put_analyses(self, results, version):
+        """Store analyses given as (url, content_hash, sentiment, sentiment_score, topics) tuples"""
+        now = time.time()
+        rows = [(canonical_url(url), version, digest, sentiment, score, json.dumps(topics), now)
+                for url, digest, sentiment, score, topics in results]
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO analyses (canonical_url, version, content_hash, sentiment, "
+                "sentiment_score, topics, analyzed_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def stats(self):
+        """Return the number of stored articles and analyses"""
+        conn = self._connect()
+        return {
+            "articles": conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0],
+            "analyses": conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        }
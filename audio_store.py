@@ -0,0 +1,117 @@
+import hashlib
+import os
+import threading
+import time
+
+# Audio store defaults, overridable from the environment
+AUDIO_DIR = os.environ.get("NEWS_AUDIO_DIR", "audio_cache")
+AUDIO_MAX_BYTES = int(os.environ.get("NEWS_AUDIO_MAX_BYTES", 200 * 1024 * 1024))
+
+
+class AudioStore:
+    """
+    Content-addressed store for synthesized audio.
+    Files are keyed by a hash of (text, language, backend), written atomically
+    and evicted least recently used first once the store exceeds max_bytes.
+    """
+
+    def __init__(self, directory=AUDIO_DIR, max_bytes=AUDIO_MAX_BYTES, extension="mp3"):
+        self.directory = directory
+        self.max_bytes = max(0, max_bytes)
+        self.extension = extension
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(text, lang, backend):
+        """Return the content address for a synthesis request"""
+        payload = "\x00".join([backend, lang, text]).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def path_for(self, key):
+        """Return the file path an entry is (or would be) stored at"""
+        return os.path.join(self.directory, f"{key}.{self.extension}")
+
+    def get(self, key):
+        """Return the path of a stored entry, or None if it is missing"""
+        path = self.path_for(key)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            try:
+                # Refresh only the access time used for LRU eviction; the mtime marks when
+                # the audio was written and feeds the HTTP validators of /api/audio
+                os.utime(path, (time.time(), os.stat(path).st_mtime))
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            return path
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, write):
+        """
+        Store an entry by calling write(tmp_path) and atomically moving the
+        result into place, so concurrent writers of the same key never collide
+        """
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict(keep=path)
+        return path
+
+    def get_or_create(self, key, write):
+        """Return the stored path for key, synthesizing it with write on a miss"""
+        return self.get(key) or self.put(key, write)
+
+    def stats(self):
+        """Return hit/miss counters and current disk usage"""
+        entries = self._entries()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes
+            }
+
+    def _entries(self):
+        entries = []
+        suffix = f".{self.extension}"
+        for name in os.listdir(self.directory):
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+        return entries
+
+    def _evict(self, keep=None):
+        """Remove least recently used files, except keep, until the store fits max_bytes"""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
@@ -0,0 +1,122 @@
+"""
+Shared helpers for the offline benchmarks: corpus loading, a local fixture
+HTTP server, a stub TTS backend and latency/RSS reporting.
+"""
+import glob
+import http.server
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "corpus")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def configure_offline_environment():
+    """Keep benchmarks off the network and free of persistent caches"""
+    os.environ.setdefault("NEWS_OFFLINE", "1")
+    os.environ.setdefault("NEWS_ARTICLE_DB", "")
+    os.environ.setdefault("NEWS_HISTORY_DB", "")
+    os.environ.setdefault("NEWS_HTTP_CACHE_DIR", "")
+    os.environ.setdefault("NEWS_HTTP_RETRIES", "0")
+    os.environ.setdefault("NEWS_AUDIO_DIR", tempfile.mkdtemp(prefix="news_bench_audio_"))
+
+
+def load_pages(kind):
+    """Return (name, html) pairs for benchmarks/corpus/<kind>/*.html"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, kind, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    return pages
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize_latencies(latencies_ms, items_per_call=1):
+    """Turn per-call latencies into throughput and percentile statistics"""
+    total_seconds = sum(latencies_ms) / 1000
+    items = len(latencies_ms) * items_per_call
+    return {
+        "calls": len(latencies_ms),
+        "items": items,
+        "throughput_per_s": round(items / total_seconds, 2) if total_seconds else None,
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+        "p50_ms": round(percentile(latencies_ms, 0.5), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def time_calls(fn, args_list, repeat=1, warmup=1):
+    """Call fn(*args) for every args in args_list, repeat times; return latencies in ms"""
+    for args in args_list[:warmup]:
+        fn(*args)
+    latencies = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            fn(*args)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+class FixtureServer:
+    """Serve the recorded corpus over HTTP on a free local port"""
+
+    def __init__(self, directory=CORPUS_DIR):
+        handler = type("QuietHandler", (http.server.SimpleHTTPRequestHandler,), {
+            "log_message": lambda self, *args: None
+        })
+        self._server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), lambda *args: handler(*args, directory=directory))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def install_stub_tts():
+    """
+    Replace the gtts module with a stub that writes a small fixed payload,
+    so TTS timings measure our code rather than the Google service
+    """
+    class StubTTS:
+        def __init__(self, text, lang="en"):
+            self.text = text
+
+        def save(self, path):
+            with open(path, "wb") as f:
+                f.write(b"ID3" + self.text.encode("utf-8")[:256])
+
+    module = types.ModuleType("gtts")
+    module.gTTS = StubTTS
+    sys.modules["gtts"] = module
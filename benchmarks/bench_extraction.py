@@ -0,0 +1,44 @@
+"""
+Compare article extraction tiers on the recorded HTML corpus.
+
+    python benchmarks/bench_extraction.py [--repeat 20] [--output results.json]
+
+Each tier runs NewsScraper.extract_from_html over every file in
+benchmarks/corpus/articles.
+"""
+import argparse
+import json
+
+from bench_common import configure_offline_environment, load_pages, summarize_latencies, time_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article extraction tiers")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    from utils import NewsScraper
+
+    scraper = NewsScraper()
+    pages = [(f"https://news.example.com/{name}", html) for name, html in load_pages("articles")]
+    results = {"corpus_size": len(pages), "repeat": args.repeat, "tiers": {}}
+    for tier in ("full", "fast"):
+        try:
+            # time_calls makes one untimed pass so imports and NLTK loading are not measured
+            latencies = time_calls(scraper.extract_from_html, [(url, html, tier) for url, html in pages],
+                                   args.repeat)
+            results["tiers"][tier] = summarize_latencies(latencies)
+        except Exception as e:
+            results["tiers"][tier] = {"error": str(e)}
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare sentiment inference backends on accuracy and CPU throughput.
+
+    python benchmarks/bench_inference.py [--backends pytorch,onnx_int8] [--threads 4]
+                                         [--batch-size 16] [--repeat 5] [--output results.json]
+
+Accuracy is measured on the labeled sentences in benchmarks/corpus/sentiment;
+agreement and mean score drift are measured against the first backend listed
+(fp32 PyTorch by default) on those sentences plus the article corpus.
+Throughput is the batched scoring rate of all texts. Backends whose
+dependencies are missing report an error instead of results.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from bench_common import CORPUS_DIR, configure_offline_environment, load_pages, summarize_latencies, time_calls
+
+
+def load_labeled():
+    """Return (texts, labels) from benchmarks/corpus/sentiment/labeled.jsonl"""
+    texts, labels = [], []
+    with open(os.path.join(CORPUS_DIR, "sentiment", "labeled.jsonl"), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                texts.append(row["text"])
+                labels.append(row["label"])
+    return texts, labels
+
+
+def run_backend(backend, model_id, threads, texts, labels, batch_size, repeat):
+    from inference import load_sentiment_backend
+
+    start = time.perf_counter()
+    analyzer = load_sentiment_backend(backend, model_id, threads)
+    load_seconds = time.perf_counter() - start
+
+    predictions = analyzer(texts, batch_size=batch_size, truncation=True)
+    # Labeled sentences come first, so zip only pairs them with their labels
+    correct = sum(1 for p, label in zip(predictions, labels) if p["label"].upper() == label.upper())
+
+    stats = summarize_latencies(
+        time_calls(lambda batch: analyzer(batch, batch_size=batch_size, truncation=True), [(texts,)], repeat),
+        items_per_call=len(texts))
+    stats.update({
+        "load_seconds": round(load_seconds, 3),
+        "accuracy": round(correct / len(labels), 4)
+    })
+    return stats, predictions
+
+
+def compare(predictions, reference):
+    """Label agreement and mean absolute signed-score difference against a reference backend"""
+    def signed(p):
+        return p["score"] if p["label"].upper() == "POSITIVE" else -p["score"]
+
+    agreement = sum(1 for p, r in zip(predictions, reference) if p["label"] == r["label"])
+    drift = sum(abs(signed(p) - signed(r)) for p, r in zip(predictions, reference))
+    return {
+        "agreement": round(agreement / len(reference), 4),
+        "mean_score_drift": round(drift / len(reference), 4)
+    }
+
+
+def main():
+    from inference import BACKENDS, INFERENCE_THREADS, SENTIMENT_MODEL
+
+    parser = argparse.ArgumentParser(description="Compare sentiment inference backends")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--model", default=SENTIMENT_MODEL)
+    parser.add_argument("--threads", type=int, default=INFERENCE_THREADS)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    from extraction import extract_main_text
+
+    labeled_texts, labels = load_labeled()
+    texts = labeled_texts + [extract_main_text(html)["text"] for _, html in load_pages("articles")]
+
+    results = {"model": args.model, "threads": args.threads, "batch_size": args.batch_size,
+               "labeled_texts": len(labels), "texts": len(texts), "backends": {}}
+    reference = None
+    for backend in args.backends.split(","):
+        try:
+            # Model loading and export messages go to stderr so stdout stays valid JSON
+            with contextlib.redirect_stdout(sys.stderr):
+                stats, predictions = run_backend(backend, args.model, args.threads, texts,
+                                                 labels, args.batch_size, args.repeat)
+        except Exception as e:
+            results["backends"][backend] = {"error": str(e)}
+            continue
+        if reference is None:
+            reference = predictions
+        else:
+            stats.update(compare(predictions, reference))
+        results["backends"][backend] = stats
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Offline benchmark of every NewsScraper pipeline stage.
+
+    python benchmarks/bench_pipeline.py [--repeat 10] [--output results.json]
+
+Runs entirely from the recorded corpus in benchmarks/corpus: search result
+pages are parsed directly, article pages are served by a local fixture HTTP
+server and gTTS is replaced by a stub. Results are JSON with throughput,
+p50/p99 latency and peak RSS per stage, suitable for diffing between releases.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+
+from bench_common import (FixtureServer, configure_offline_environment, install_stub_tts,
+                          load_pages, summarize_latencies, time_calls)
+
+# Inflected topic mentions the topic index must recognise: (sentence, expected topic)
+TOPIC_CHECKS = [
+    ("Quarterly profits beat estimates", "Profit"),
+    ("The group announced two acquisitions", "Acquisition"),
+    ("Heavy losses weighed on the shares", "Loss"),
+    ("New partnerships were signed in Europe", "Partnership"),
+    ("Investments in the grid doubled", "Investment"),
+    ("Three product launches are planned", "Product Launch"),
+]
+
+
+def run(repeat):
+    configure_offline_environment()
+    install_stub_tts()
+    from utils import NewsScraper
+
+    scraper = NewsScraper()
+    scraper.warmup()
+    stages = {}
+
+    # Search result link parsing
+    search_pages = load_pages("search")
+    stages["search_news.parse_links"] = summarize_latencies(
+        time_calls(scraper.parse_search_links, [(html,) for _, html in search_pages], repeat))
+
+    # Article download and extraction through the fixture server
+    article_pages = load_pages("articles")
+    with FixtureServer() as server:
+        urls = [(f"{server.base_url}/articles/{name}.html",) for name, _ in article_pages]
+        stages["extract_article_content"] = summarize_latencies(
+            time_calls(scraper.extract_article_content, urls, repeat))
+        articles = [scraper.extract_article_content(url) for url, in urls]
+    stages["extract_article_content"]["mock_fallbacks"] = sum(1 for a in articles if a.get("is_mock"))
+
+    texts = [article["text"] for article in articles]
+    stages["analyze_sentiment"] = summarize_latencies(
+        time_calls(scraper.analyze_sentiment, [(text,) for text in texts], repeat))
+    stages["analyze_sentiment_batch"] = summarize_latencies(
+        time_calls(scraper.analyze_sentiment_batch, [(texts,)], repeat), items_per_call=len(texts))
+
+    stages["extract_topics"] = summarize_latencies(
+        time_calls(scraper.extract_topics, [(a["text"], a["keywords"]) for a in articles], repeat))
+    missed = [sentence for sentence, topic in TOPIC_CHECKS if topic not in scraper.topic_index.match(sentence)]
+    stages["extract_topics"]["inflection_checks"] = {"passed": len(TOPIC_CHECKS) - len(missed), "missed": missed}
+
+    analyzed = [{"sentiment": sentiment, "topics": scraper.extract_topics(a["text"], a["keywords"]),
+                 "url": a["url"], "title": a["title"], "summary": a["summary"]}
+                for a, sentiment in zip(articles, scraper.analyze_sentiment_batch(texts))]
+    stages["perform_comparative_analysis"] = summarize_latencies(
+        time_calls(scraper.perform_comparative_analysis, [(analyzed,)], repeat * 10))
+
+    # Cold TTS uses a new company per call so every call misses the audio store
+    cold_texts = [(f"Company: Bench{i}. Overall sentiment: positive",) for i in range(repeat * 3)]
+    stages["text_to_hindi_speech.cold"] = summarize_latencies(
+        time_calls(scraper.text_to_hindi_speech, cold_texts, 1, warmup=0))
+    stages["text_to_hindi_speech.warm"] = summarize_latencies(
+        time_calls(scraper.text_to_hindi_speech, cold_texts[:1], repeat * 3))
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "extraction_tier": scraper.extraction_tier,
+        "readiness": scraper.readiness(),
+        "stages": stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NewsScraper pipeline stages offline")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    # Pipeline progress messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run(args.repeat)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+from cachetools import TTLCache
+
+# Result cache defaults, overridable from the environment
+CACHE_TTL_SECONDS = float(os.environ.get("NEWS_CACHE_TTL", 900))
+CACHE_MAX_ENTRIES = int(os.environ.get("NEWS_CACHE_SIZE", 128))
+CACHE_DIR = os.environ.get("NEWS_CACHE_DIR") or None
+CACHE_DISK_MAX_ENTRIES = int(os.environ.get("NEWS_CACHE_DISK_SIZE", 1024))
+
+
+class ResultCache:
+    """
+    Thread-safe TTL + LRU cache for analysis results, with an optional
+    on-disk JSON backend so entries survive process restarts
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, maxsize=CACHE_MAX_ENTRIES, disk_dir=CACHE_DIR,
+                 disk_maxsize=CACHE_DISK_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maxsize = max(1, maxsize)
+        self.disk_dir = disk_dir
+        self.disk_maxsize = max(1, disk_maxsize)
+        self._memory = TTLCache(maxsize=self.maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(company_name, **params):
+        """Build a cache key from the normalized company name and parameters"""
+        name = " ".join(str(company_name).split()).lower()
+        parts = [name] + [f"{k}={params[k]}" for k in sorted(params)]
+        return "|".join(parts)
+
+    def get(self, key):
+        """Return a copy of the cached value for key, or None on a miss"""
+        with self._lock:
+            # Memory entries keep the expiry they were stored with, so an entry
+            # loaded from disk is only served for the time it had left
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._memory[key]
+                entry = None
+            if entry is None and self.disk_dir:
+                entry = self._read_disk(key)
+                if entry is not None:
+                    self._memory[key] = entry
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, value):
+        """Store a copy of value under key in memory and, if enabled, on disk"""
+        entry = (time.time() + self.ttl, copy.deepcopy(value))
+        with self._lock:
+            self._memory[key] = entry
+            if self.disk_dir:
+                self._write_disk(key, entry)
+
+    def invalidate(self, key):
+        """Drop key from every backend"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self.disk_dir:
+                try:
+                    os.remove(self._disk_path(key))
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            if self.disk_dir:
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith(".json"):
+                        try:
+                            os.remove(os.path.join(self.disk_dir, name))
+                        except OSError:
+                            pass
+
+    def stats(self):
+        """Return hit/miss counters and current sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "disk_enabled": bool(self.disk_dir)
+            }
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or entry.get("expires", 0) < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["expires"], entry.get("value")
+
+    def _write_disk(self, key, entry):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "expires": entry[0], "value": entry[1]}, f)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing cache entry to disk: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _prune_disk(self):
+        """Evict the least recently written files beyond disk_maxsize"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        if len(entries) <= self.disk_maxsize:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.disk_maxsize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
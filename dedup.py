@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+
+# Near-duplicate detection defaults, overridable from the environment
+DEDUP_ENABLED = os.environ.get("NEWS_DEDUP", "1") == "1"
+# SimHash fingerprints within this many differing bits are the same story
+DEDUP_MAX_DISTANCE = int(os.environ.get("NEWS_DEDUP_MAX_DISTANCE", 3))
+# Whether every copy of a syndicated story counts toward the sentiment distribution
+DEDUP_COUNT_DUPLICATES = os.environ.get("NEWS_DEDUP_COUNT_DUPLICATES", "0") == "1"
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+# Placeholders and stubs are too short to fingerprint reliably
+MIN_SHINGLES = 20
+
+TOKEN = re.compile(r"\w+")
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """
+    64-bit SimHash of text over word shingles, or None if the text is too
+    short. Near-identical texts get fingerprints that differ in few bits.
+    """
+    import numpy as np
+
+    words = TOKEN.findall(text.lower())
+    shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    unique, counts = np.unique(shingles, return_counts=True)
+    hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                       for s in unique], dtype=np.uint64)
+    # One row per shingle, one column per bit; each shingle votes +count or -count on every bit
+    bits = (hashes[:, None] >> np.arange(FINGERPRINT_BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = counts @ (bits.astype(np.int64) * 2 - 1)
+    return sum(1 << i for i in np.flatnonzero(votes > 0).tolist())
+
+
+class NearDuplicateIndex:
+    """
+    Incremental SimHash clustering. By the pigeonhole principle, fingerprints
+    within max_distance bits agree exactly on at least one of max_distance + 1
+    bands, so candidates are found by band lookups instead of comparing
+    against every earlier article.
+    """
+
+    def __init__(self, max_distance=DEDUP_MAX_DISTANCE):
+        self.max_distance = max(0, max_distance)
+        bands = self.max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands = [(i * width, FINGERPRINT_BITS if i == bands - 1 else (i + 1) * width) for i in range(bands)]
+        self._buckets = {}
+        self._fingerprints = {}
+
+    def add(self, key, fingerprint):
+        """
+        Add key with its fingerprint and return the key of the cluster it joins:
+        an earlier near-duplicate's key, or key itself if it starts a new cluster
+        """
+        band_keys = [(i, (fingerprint >> start) & ((1 << (end - start)) - 1))
+                     for i, (start, end) in enumerate(self._bands)]
+        for band_key in band_keys:
+            for candidate in self._buckets.get(band_key, ()):
+                if bin(self._fingerprints[candidate] ^ fingerprint).count("1") <= self.max_distance:
+                    return candidate
+        self._fingerprints[key] = fingerprint
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(key)
+        return key
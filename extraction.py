@@ -0,0 +1,112 @@
+import re
+from collections import Counter
+
+# Elements that never hold article body text
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+                    "iframe", "svg", "button", "figure"]
+
+# Paragraphs shorter than this are usually captions, bylines or links
+MIN_PARAGRAPH_CHARS = 40
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own said same says she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours yourself yourselves new one two year years per cent
+""".split())
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+
+
+def extract_main_text(html):
+    """
+    Extract title, body text and publish date from article HTML with lxml.
+    The body is the paragraph block whose parent element holds the most
+    paragraph text, which skips navigation, teasers and comments.
+    """
+    import lxml.html
+
+    tree = lxml.html.fromstring(html)
+    for element in list(tree.iter(*BOILERPLATE_TAGS)):
+        element.drop_tree()
+
+    title = (_meta(tree, "og:title") or _first_text(tree, "//title") or _first_text(tree, "//h1") or "").strip()
+    publish_date = _meta(tree, "article:published_time") or _meta(tree, "datePublished")
+
+    blocks = {}
+    for paragraph in tree.iter("p"):
+        text = " ".join(paragraph.text_content().split())
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        parent = paragraph.getparent()
+        blocks.setdefault(parent, []).append(text)
+
+    if blocks:
+        body = max(blocks.values(), key=lambda paragraphs: sum(len(p) for p in paragraphs))
+        text = "\n\n".join(body)
+    else:
+        text = " ".join(tree.text_content().split())
+
+    return {
+        "title": title,
+        "text": text,
+        "publish_date": publish_date[:10] if publish_date else None
+    }
+
+
+def _meta(tree, name):
+    values = tree.xpath(f'//meta[@property="{name}" or @name="{name}" or @itemprop="{name}"]/@content')
+    return values[0].strip() if values else None
+
+
+def _first_text(tree, xpath):
+    nodes = tree.xpath(xpath)
+    return nodes[0].text_content() if nodes else None
+
+
+def split_sentences(text):
+    """Split text into sentences on terminal punctuation"""
+    return [s.strip() for s in SENTENCE_SPLIT.split(" ".join(text.split())) if s.strip()]
+
+
+def summarize(text, max_sentences=5):
+    """
+    Vectorized extractive summary: score each sentence by the mean document
+    frequency of its content words (a sentence-term matrix times a term
+    weight vector) and keep the top sentences in their original order
+    """
+    import numpy as np
+
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    tokenized = [[w for w in WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    vocabulary = {word: i for i, word in enumerate({w for words in tokenized for w in words})}
+    if not vocabulary:
+        return " ".join(sentences[:max_sentences])
+
+    matrix = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    for row, words in enumerate(tokenized):
+        for word in words:
+            matrix[row, vocabulary[word]] += 1
+
+    term_weights = matrix.sum(axis=0)
+    term_weights /= term_weights.max()
+    lengths = np.maximum(matrix.sum(axis=1), 1)
+    scores = matrix @ term_weights / lengths
+    # Lead sentences carry the story in news writing
+    scores += np.linspace(0.1, 0, len(sentences))
+
+    top = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+    return " ".join(sentences[i] for i in top)
+
+
+def extract_keywords(text, max_keywords=10):
+    """Return the most frequent content words of text"""
+    counts = Counter(w for w in WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 2)
+    return [word for word, _ in counts.most_common(max_keywords)]
@@ -0,0 +1,206 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from article_store import canonical_url
+
+# Sentiment history defaults, overridable from the environment.
+# An empty NEWS_HISTORY_DB disables the history store.
+HISTORY_DB_PATH = os.environ.get("NEWS_HISTORY_DB", "history.db")
+HISTORY_DEFAULT_DAYS = int(os.environ.get("NEWS_HISTORY_DAYS", 30))
+HISTORY_DEFAULT_WINDOW = int(os.environ.get("NEWS_HISTORY_WINDOW", 7))
+
+SENTIMENT_COLUMNS = {"Positive": "positive", "Negative": "negative", "Neutral": "neutral"}
+
+
+def _signed_score(sentiment, score):
+    """Model confidence signed by direction; None for keyword-fallback results"""
+    if score is None:
+        return None
+    return score if sentiment == "Positive" else -score if sentiment == "Negative" else 0.0
+
+
+def _article_day(publish_date, fetched_at):
+    """The day an article counts towards: its publish date, else the day it was fetched"""
+    if publish_date:
+        try:
+            return datetime.date.fromisoformat(str(publish_date)[:10]).isoformat()
+        except ValueError:
+            pass
+    return datetime.datetime.fromtimestamp(fetched_at, datetime.timezone.utc).date().isoformat()
+
+
+class SentimentHistory:
+    """
+    SQLite time series of per-article sentiment for each company.
+    Every write also updates a per-company, per-day aggregate row in the same
+    transaction, so range and rolling queries read one row per day no matter
+    how many articles have been recorded.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    company TEXT NOT NULL,
+                    canonical_url TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    day TEXT NOT NULL,
+                    publish_date TEXT,
+                    fetched_at REAL NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    signed_score REAL,
+                    PRIMARY KEY (company, canonical_url)
+                ) WITHOUT ROWID""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily (
+                    company TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    articles INTEGER NOT NULL,
+                    positive INTEGER NOT NULL,
+                    negative INTEGER NOT NULL,
+                    neutral INTEGER NOT NULL,
+                    signed_sum REAL NOT NULL,
+                    scored INTEGER NOT NULL,
+                    PRIMARY KEY (company, day)
+                ) WITHOUT ROWID""")
+
+    @staticmethod
+    def company_key(company):
+        return " ".join(company.split()).lower()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode so record() controls its own IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def record(self, company, articles, fetched_at=None):
+        """
+        Record analyzed articles ({"url", "title", "sentiment", "sentiment_score",
+        "publish_date"}) for company. Each article counts once per company;
+        seeing it again with a different result moves its contribution.
+        """
+        company = self.company_key(company)
+        fetched_at = fetched_at or time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for article in articles:
+                key = canonical_url(article["url"])
+                day = _article_day(article.get("publish_date"), fetched_at)
+                sentiment = article["sentiment"]
+                signed = _signed_score(sentiment, article.get("sentiment_score"))
+                previous = conn.execute(
+                    "SELECT day, sentiment, signed_score FROM observations WHERE company = ? AND canonical_url = ?",
+                    (company, key)).fetchone()
+                if previous == (day, sentiment, signed):
+                    continue
+                if previous is not None:
+                    self._add_to_day(conn, company, *previous, sign=-1)
+                conn.execute(
+                    "INSERT OR REPLACE INTO observations (company, canonical_url, url, title, day, publish_date, "
+                    "fetched_at, sentiment, signed_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (company, key, article["url"], article.get("title"), day, article.get("publish_date"),
+                     fetched_at, sentiment, signed))
+                self._add_to_day(conn, company, day, sentiment, signed, sign=1)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _add_to_day(self, conn, company, day, sentiment, signed, sign):
+        counts = {column: sign if SENTIMENT_COLUMNS.get(sentiment) == column else 0
+                  for column in SENTIMENT_COLUMNS.values()}
+        conn.execute(
+            "INSERT INTO daily (company, day, articles, positive, negative, neutral, signed_sum, scored) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (company, day) DO UPDATE SET "
+            "articles = articles + excluded.articles, positive = positive + excluded.positive, "
+            "negative = negative + excluded.negative, neutral = neutral + excluded.neutral, "
+            "signed_sum = signed_sum + excluded.signed_sum, scored = scored + excluded.scored",
+            (company, day, sign, counts["positive"], counts["negative"], counts["neutral"],
+             sign * signed if signed is not None else 0.0, sign if signed is not None else 0))
+
+    def series(self, company, days=HISTORY_DEFAULT_DAYS, window=HISTORY_DEFAULT_WINDOW, end=None):
+        """
+        Daily sentiment for the last days days up to end (default today, UTC),
+        each with rolling aggregates over the preceding window days
+        """
+        days, window = max(1, days), max(1, window)
+        end = datetime.date.fromisoformat(end) if end else datetime.datetime.now(datetime.timezone.utc).date()
+        start = end - datetime.timedelta(days=days - 1)
+        first = start - datetime.timedelta(days=window - 1)
+        rows = self._connect().execute(
+            "SELECT day, articles, positive, negative, neutral, signed_sum, scored FROM daily "
+            "WHERE company = ? AND day BETWEEN ? AND ?",
+            (self.company_key(company), first.isoformat(), end.isoformat())).fetchall()
+        by_day = {row[0]: row[1:] for row in rows}
+
+        series = []
+        rolling = deque()
+        totals = [0, 0, 0, 0, 0.0, 0]
+        day = first
+        while day <= end:
+            values = by_day.get(day.isoformat(), (0, 0, 0, 0, 0.0, 0))
+            rolling.append(values)
+            totals = [t + v for t, v in zip(totals, values)]
+            if len(rolling) > window:
+                totals = [t - v for t, v in zip(totals, rolling.popleft())]
+            if day >= start:
+                point = dict(day=day.isoformat(), **self._aggregate(values))
+                point.update({f"rolling_{name}": value for name, value in self._aggregate(totals).items()})
+                series.append(point)
+            day += datetime.timedelta(days=1)
+        return {"company": self.company_key(company), "window_days": window, "series": series}
+
+    def summary(self, company, days=HISTORY_DEFAULT_WINDOW, end=None):
+        """Sentiment totals for the last days days up to end (default today, UTC)"""
+        days = max(1, days)
+        end = datetime.date.fromisoformat(end) if end else datetime.datetime.now(datetime.timezone.utc).date()
+        start = end - datetime.timedelta(days=days - 1)
+        row = self._connect().execute(
+            "SELECT COALESCE(SUM(articles), 0), COALESCE(SUM(positive), 0), COALESCE(SUM(negative), 0), "
+            "COALESCE(SUM(neutral), 0), COALESCE(SUM(signed_sum), 0.0), COALESCE(SUM(scored), 0) "
+            "FROM daily WHERE company = ? AND day BETWEEN ? AND ?",
+            (self.company_key(company), start.isoformat(), end.isoformat())).fetchone()
+        return dict(company=self.company_key(company), start=start.isoformat(), end=end.isoformat(),
+                    **self._aggregate(row))
+
+    def companies(self):
+        """Companies with recorded history, their article counts and date range"""
+        rows = self._connect().execute(
+            "SELECT company, SUM(articles), MIN(day), MAX(day) FROM daily "
+            "WHERE articles > 0 GROUP BY company ORDER BY company").fetchall()
+        return [{"company": company, "articles": articles, "first_day": first, "last_day": last}
+                for company, articles, first, last in rows]
+
+    @staticmethod
+    def _aggregate(values):
+        articles, positive, negative, neutral, signed_sum, scored = values
+        return {
+            "articles": articles,
+            "positive": positive,
+            "negative": negative,
+            "neutral": neutral,
+            # Share of positive minus share of negative articles, in [-1, 1]
+            "net_sentiment": round((positive - negative) / articles, 4) if articles else None,
+            # Mean signed model confidence over model-scored articles
+            "mean_score": round(signed_sum / scored, 4) if scored else None
+        }
+
+    def stats(self):
+        """Return the number of recorded observations and daily aggregate rows"""
+        conn = self._connect()
+        return {
+            "observations": conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0],
+            "daily_rows": conn.execute("SELECT COUNT(*) FROM daily").fetchone()[0]
+        }
@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Outbound HTTP defaults, overridable from the environment
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+HTTP_POOL_CONNECTIONS = int(os.environ.get("NEWS_HTTP_POOL_CONNECTIONS", 20))
+HTTP_POOL_SIZE = int(os.environ.get("NEWS_HTTP_POOL_SIZE", 10))
+# Per-host overrides, e.g. "www.google.com=4,www.reuters.com=2"
+HTTP_HOST_POOL_SIZES = os.environ.get("NEWS_HTTP_HOST_POOL_SIZES", "")
+HTTP_RETRIES = int(os.environ.get("NEWS_HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.environ.get("NEWS_HTTP_BACKOFF", 0.5))
+HTTP_CACHE_DIR = os.environ.get("NEWS_HTTP_CACHE_DIR", "http_cache")
+HTTP_CACHE_MAX_ENTRIES = int(os.environ.get("NEWS_HTTP_CACHE_SIZE", 2000))
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+
+def response_html(response):
+    """
+    Decode an HTML response. requests assumes ISO-8859-1 for text/* without a
+    charset header, which garbles UTF-8 pages, so in that case the charset comes
+    from the page's meta tag, else UTF-8 if the bytes are valid UTF-8, else detection.
+    """
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        return response.text
+    content = response.content
+    match = META_CHARSET.search(content[:4096])
+    if match:
+        try:
+            return content.decode(match.group(1).decode("ascii"), errors="replace")
+        except LookupError:
+            pass
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode(response.apparent_encoding or "latin-1", errors="replace")
+
+
+def parse_host_pool_sizes(spec):
+    """Parse "host=size,host=size" into a dict"""
+    sizes = {}
+    for item in spec.split(","):
+        host, _, size = item.strip().partition("=")
+        if host and size.strip().isdigit():
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+class ConditionalCache:
+    """
+    On-disk store of response bodies with their ETag/Last-Modified validators,
+    used to turn repeated fetches into conditional GETs
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return f"{base}.json", f"{base}.body"
+
+    def load(self, url):
+        """Return (meta, body) for url, or (None, None) if it is not cached"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            return None, None
+        return meta, body
+
+    def store(self, url, response):
+        """Store a 200 response for the requested url if it carries a validator"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        # Key on the requested URL so redirects still hit the same entry
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": response.encoding,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")}
+        }
+        meta_path, body_path = self._paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(body_path + suffix, "wb") as f:
+                f.write(response.content)
+            with open(meta_path + suffix, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(body_path + suffix, body_path)
+            os.replace(meta_path + suffix, meta_path)
+            self._prune()
+        except OSError as e:
+            print(f"Error writing HTTP cache entry: {e}")
+            for path in (body_path + suffix, meta_path + suffix):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def touch(self, url):
+        """Mark an entry as recently revalidated"""
+        for path in self._paths(url):
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+    def _prune(self):
+        """Evict the least recently revalidated entries beyond max_entries"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort()
+            for _, meta_path in entries[:len(entries) - self.max_entries]:
+                for path in (meta_path, meta_path[:-len(".json")] + ".body"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+
+class HttpClient:
+    """
+    Shared, thread-safe HTTP client with keep-alive connection pools,
+    retries with backoff and an optional conditional-GET disk cache
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_size=HTTP_POOL_SIZE,
+                 host_pool_sizes=None, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF,
+                 cache_dir=HTTP_CACHE_DIR, cache_max_entries=HTTP_CACHE_MAX_ENTRIES,
+                 user_agent=DEFAULT_USER_AGENT):
+        if host_pool_sizes is None:
+            host_pool_sizes = parse_host_pool_sizes(HTTP_HOST_POOL_SIZES)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+
+        default_adapter = self._make_adapter(pool_connections, pool_size)
+        self.session.mount("https://", default_adapter)
+        self.session.mount("http://", default_adapter)
+        # Callers with a hard deadline make a single attempt through this session
+        self.single_attempt_session = requests.Session()
+        self.single_attempt_session.headers["User-Agent"] = user_agent
+        single_attempt_adapter = self._make_adapter(pool_connections, pool_size, retries=0)
+        self.single_attempt_session.mount("https://", single_attempt_adapter)
+        self.single_attempt_session.mount("http://", single_attempt_adapter)
+        for host, size in host_pool_sizes.items():
+            adapter = self._make_adapter(1, size)
+            self.session.mount(f"https://{host}", adapter)
+            self.session.mount(f"http://{host}", adapter)
+
+        self.cache = ConditionalCache(cache_dir, cache_max_entries) if cache_dir else None
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.fetched = 0
+
+    def _make_adapter(self, pool_connections, pool_size, retries=None):
+        retry = Retry(total=self.retries if retries is None else retries, backoff_factor=self.backoff,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["GET", "HEAD"]),
+                      respect_retry_after_header=True, raise_on_status=False)
+        return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_size,
+                           max_retries=retry)
+
+    def get(self, url, headers=None, timeout=10, use_cache=True, retry=True, **kwargs):
+        """
+        GET url through the shared session. Cached responses are revalidated
+        with If-None-Match/If-Modified-Since and served from disk on 304.
+        With retry=False a failed request is not retried.
+        """
+        headers = dict(headers or {})
+        meta, body = (None, None)
+        if use_cache and self.cache is not None:
+            meta, body = self.cache.load(url)
+            if meta is not None:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+        session = self.session if retry else self.single_attempt_session
+        response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            with self._lock:
+                self.revalidated += 1
+            self.cache.touch(url)
+            return self._cached_response(url, meta, body, response)
+
+        with self._lock:
+            self.fetched += 1
+        if use_cache and self.cache is not None and response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def _cached_response(self, url, meta, body, not_modified):
+        """Rebuild a 200 response from a cache entry after a 304"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.url = url
+        response.encoding = meta.get("encoding")
+        response.headers.update(meta.get("headers", {}))
+        for name, value in not_modified.headers.items():
+            if name.lower() not in ("content-length", "transfer-encoding", "content-encoding"):
+                response.headers[name] = value
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        return response
+
+    def stats(self):
+        """Return counts of full fetches and 304 revalidations"""
+        with self._lock:
+            return {"fetched": self.fetched, "revalidated": self.revalidated,
+                    "cache_enabled": self.cache is not None}
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide shared HttpClient"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
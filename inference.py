@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+
+# Sentiment inference defaults, overridable from the environment
+SENTIMENT_MODEL = os.environ.get("NEWS_SENTIMENT_MODEL", "distilbert-base-uncased-finetuned-sst-2-english")
+INFERENCE_BACKEND = os.environ.get("NEWS_INFERENCE_BACKEND", "pytorch")
+# 0 keeps the library default (usually one thread per core)
+INFERENCE_THREADS = int(os.environ.get("NEWS_INFERENCE_THREADS", 0))
+ONNX_CACHE_DIR = os.environ.get("NEWS_ONNX_CACHE_DIR", "onnx_models")
+
+# pytorch: fp32 transformers pipeline; pytorch_int8: dynamic int8 quantization of
+# the Linear layers; onnx / onnx_int8: exported graph run by ONNX Runtime
+BACKENDS = ("pytorch", "pytorch_int8", "onnx", "onnx_int8")
+
+_export_lock = threading.Lock()
+
+
+def load_sentiment_backend(backend=INFERENCE_BACKEND, model_id=SENTIMENT_MODEL, threads=INFERENCE_THREADS,
+                           cache_dir=ONNX_CACHE_DIR):
+    """
+    Build a sentiment classifier for the chosen backend. Every backend is
+    called like a transformers pipeline, analyzer(texts, batch_size=..,
+    truncation=True), returns [{"label", "score"}] and exposes .tokenizer
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    if backend.startswith("onnx"):
+        path, labels = export_onnx_model(model_id, cache_dir, quantize=backend == "onnx_int8")
+        return OnnxSentimentPipeline(path, tokenizer, labels, model_id, threads)
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, pipeline
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+    if backend == "pytorch_int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def export_onnx_model(model_id, cache_dir=ONNX_CACHE_DIR, quantize=False):
+    """
+    Export model_id to ONNX once (and optionally quantize its weights to int8),
+    caching the files under cache_dir. Returns (model_path, labels).
+    """
+    from transformers import AutoConfig
+
+    config = AutoConfig.from_pretrained(model_id)
+    labels = [config.id2label[i] for i in range(config.num_labels)]
+    directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id))
+    fp32_path = os.path.join(directory, "model.onnx")
+    int8_path = os.path.join(directory, "model.int8.onnx")
+
+    with _export_lock:
+        if not os.path.exists(fp32_path):
+            os.makedirs(directory, exist_ok=True)
+            _export_fp32(model_id, fp32_path)
+        if quantize and not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp_path = f"{int8_path}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+    return (int8_path if quantize else fp32_path), labels
+
+
+def _export_fp32(model_id, path):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    print(f"Exporting {model_id} to ONNX...")
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+    # Only the inputs the model accepts (e.g. no token_type_ids for DistilBERT)
+    sample = tokenizer(["Export sample sentence."], return_tensors="pt")
+    input_names = [name for name in tokenizer.model_input_names if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    tmp_path = f"{path}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in input_names), tmp_path,
+                          input_names=input_names, output_names=["logits"],
+                          dynamic_axes=dynamic_axes, opset_version=14)
+    os.replace(tmp_path, path)
+
+
+class OnnxSentimentPipeline:
+    """
+    Sequence classification on an ONNX Runtime CPU session with the
+    call signature and output format of a transformers sentiment pipeline
+    """
+
+    def __init__(self, path, tokenizer, labels, model_id, threads=INFERENCE_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = tokenizer
+        self.labels = labels
+        self.model_id = model_id
+        self.path = path
+
+    def __call__(self, texts, batch_size=8, truncation=True, **kwargs):
+        import numpy as np
+
+        if isinstance(texts, str):
+            texts = [texts]
+        max_length = min(getattr(self.tokenizer, "model_max_length", 512) or 512, 512)
+        results = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            encoded = self.tokenizer(list(texts[start:start + batch_size]), padding=True,
+                                     truncation=truncation, max_length=max_length, return_tensors="np")
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            logits = self.session.run(None, feeds)[0]
+            # Softmax over labels, shifted for numerical stability
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities = exp / exp.sum(axis=1, keepdims=True)
+            for row in probabilities:
+                best = int(row.argmax())
+                results.append({"label": self.labels[best], "score": float(row[best])})
+        return results
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import re
+
+# Optional JSON lexicon file mapping terms to signed weights
+LEXICON_PATH = os.environ.get("NEWS_SENTIMENT_LEXICON") or None
+
+DEFAULT_POSITIVE_TERMS = ['increase', 'growth', 'profit', 'success', 'positive', 'up', 'gain', 'improved',
+                          'higher', 'surge', 'advantage', 'opportunity', 'exceed', 'beat']
+DEFAULT_NEGATIVE_TERMS = ['decline', 'loss', 'trouble', 'fail', 'negative', 'down', 'decrease', 'reduced',
+                          'lower', 'drop', 'risk', 'concern', 'miss', 'problem']
+
+# Inflections accepted after a lexicon term, so "gain" also matches "gains"
+INFLECTION_SUFFIX = r"(?:s|es|ed|d|ing)?"
+
+
+class SentimentLexicon:
+    """
+    Weighted keyword lexicon compiled into a single word-boundary regex.
+    Positive weights count towards Positive, negative weights towards Negative.
+    By default each distinct term counts once per text, and a side must lead
+    the other by more than margin to win.
+    """
+
+    def __init__(self, weights=None, margin=1.0, binary=True):
+        if weights is None:
+            weights = {term: 1.0 for term in DEFAULT_POSITIVE_TERMS}
+            weights.update({term: -1.0 for term in DEFAULT_NEGATIVE_TERMS})
+        self.weights = {" ".join(term.lower().split()): float(w) for term, w in weights.items() if w}
+        self.margin = margin
+        self.binary = binary
+        # Identifies the lexicon, so stored results can be tied to it
+        self.fingerprint = hashlib.sha1(json.dumps([sorted(self.weights.items()), margin, binary])
+                                        .encode("utf-8")).hexdigest()
+        self.terms = sorted(self.weights, key=len, reverse=True)
+        self._index = {term: i for i, term in enumerate(self.terms)}
+        alternation = "|".join(re.escape(term).replace(r"\ ", r"\s+") for term in self.terms)
+        self._pattern = re.compile(rf"\b({alternation}){INFLECTION_SUFFIX}\b", re.IGNORECASE)
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH, **kwargs):
+        """
+        Build a lexicon from a JSON file of {"term": weight}, or from
+        {"positive": [...], "negative": [...]}; the default lexicon if path is None
+        """
+        if not path:
+            return cls(**kwargs)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if "positive" in data or "negative" in data:
+            weights = {term: 1.0 for term in data.get("positive", [])}
+            weights.update({term: -1.0 for term in data.get("negative", [])})
+        else:
+            weights = data
+        return cls(weights, **kwargs)
+
+    def _term_ids(self, text):
+        """Return lexicon term indices matched in text in a single pass"""
+        ids = [self._index[" ".join(m.group(1).lower().split())] for m in self._pattern.finditer(text)]
+        return set(ids) if self.binary else ids
+
+    def score(self, text):
+        """Return (positive_score, negative_score) for one text"""
+        pos = neg = 0.0
+        for term_id in self._term_ids(text):
+            weight = self.weights[self.terms[term_id]]
+            if weight > 0:
+                pos += weight
+            else:
+                neg -= weight
+        return pos, neg
+
+    def classify(self, text):
+        """Label one text Positive, Negative or Neutral"""
+        return self._label(*self.score(text))
+
+    def score_batch(self, texts):
+        """
+        Score many texts at once. Matches are collected into a sparse
+        document-term matrix in coordinate form and reduced with NumPy.
+        Returns (positive_scores, negative_scores) arrays.
+        """
+        import numpy as np
+
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            term_ids = self._term_ids(text)
+            rows.extend([row] * len(term_ids))
+            cols.extend(term_ids)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        term_weights = np.asarray([self.weights[term] for term in self.terms], dtype=np.float64)
+        matched = term_weights[cols] if len(cols) else np.zeros(0)
+        pos = np.bincount(rows, weights=np.clip(matched, 0, None), minlength=len(texts))
+        neg = np.bincount(rows, weights=np.clip(-matched, 0, None), minlength=len(texts))
+        return pos, neg
+
+    def classify_batch(self, texts):
+        """Label many texts, returning one label per text in input order"""
+        texts = list(texts)
+        if not texts:
+            return []
+        pos, neg = self.score_batch(texts)
+        return [self._label(p, n) for p, n in zip(pos.tolist(), neg.tolist())]
+
+    def _label(self, pos, neg):
+        if pos > neg + self.margin:  # Require stronger positive signal
+            return "Positive"
+        elif neg > pos + self.margin:  # Require stronger negative signal
+            return "Negative"
+        else:
+            return "Neutral"
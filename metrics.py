@@ -0,0 +1,93 @@
+import contextlib
+
+# prometheus_client is optional; without it every metric is a no-op
+try:
+    from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _NoOpMetric:
+    """Stand-in for prometheus_client metrics when the package is missing"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    def set_function(self, fn):
+        pass
+
+    def time(self):
+        return contextlib.nullcontext()
+
+
+if not PROMETHEUS_AVAILABLE:
+    Counter = Gauge = Histogram = _NoOpMetric
+
+# Pipeline stages span ~1ms (parsing) to tens of seconds (downloads, cold inference)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+STAGE_LATENCY = Histogram("news_stage_duration_seconds",
+                          "Latency of NewsScraper pipeline stages", ["stage"], buckets=LATENCY_BUCKETS)
+STAGE_ERRORS = Counter("news_stage_errors_total", "Errors caught in NewsScraper pipeline stages", ["stage"])
+FALLBACKS = Counter("news_fallbacks_total", "Times a mock or degraded fallback was used", ["kind"])
+RESPONSES = Counter("news_responses_total", "Company analyses returned, by outcome", ["outcome"])
+NEAR_DUPLICATES = Counter("news_near_duplicates_total", "Articles that reused the analysis of a near-duplicate")
+
+
+def time_stage(stage):
+    """Context manager observing the duration of a pipeline stage"""
+    return STAGE_LATENCY.labels(stage).time()
+
+
+def record_error(stage):
+    STAGE_ERRORS.labels(stage).inc()
+
+
+def record_fallback(kind, amount=1):
+    if amount:
+        FALLBACKS.labels(kind).inc(amount)
+
+
+def record_response(outcome):
+    RESPONSES.labels(outcome).inc()
+
+
+def record_near_duplicates(amount):
+    if amount:
+        NEAR_DUPLICATES.inc(amount)
+
+
+_gauges = {}
+
+
+def register_gauge(name, documentation, fn):
+    """Expose fn() as a gauge; registering the same name again replaces the callback"""
+    gauge = _gauges.get(name)
+    if gauge is None:
+        gauge = _gauges[name] = Gauge(name, documentation)
+    gauge.set_function(fn)
+
+
+def register_stats_gauges(prefix, component, stats, fields):
+    """Expose fields of a component's stats() dict as gauges named <prefix>_<field>"""
+    for field in fields:
+        register_gauge(f"{prefix}_{field}", f"{component}: {field.replace('_', ' ')}",
+                       lambda field=field: stats()[field])
+
+
+def render_metrics():
+    """Return (body, content_type) in the Prometheus text exposition format"""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
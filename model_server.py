@@ -0,0 +1,321 @@
+"""
+Shared sentiment model server.
+
+One process owns the model; API workers and Streamlit sessions send it
+inference requests over a local socket and the server micro-batches texts
+from concurrent requests into shared forward passes. Start it with
+
+    python model_server.py [--address model_server.sock] [--backend onnx_int8]
+
+and point clients at it with NEWS_MODEL_SERVER=model_server.sock.
+"""
+import argparse
+import os
+import queue
+import secrets
+import stat
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from inference import BACKENDS, INFERENCE_BACKEND, INFERENCE_THREADS, SENTIMENT_MODEL, load_sentiment_backend
+
+# Model server defaults, overridable from the environment.
+# An empty NEWS_MODEL_SERVER keeps the model inside each process.
+MODEL_SERVER_ADDRESS = os.environ.get("NEWS_MODEL_SERVER", "")
+# A Unix socket is only reachable from this machine and is created owner-only
+DEFAULT_LISTEN_ADDRESS = "model_server.sock"
+# Messages are pickled, so every client must hold the server's secret key:
+# NEWS_MODEL_SERVER_KEY if set, else a random key the server writes to an owner-only file
+MODEL_SERVER_KEY = os.environ.get("NEWS_MODEL_SERVER_KEY", "")
+MODEL_SERVER_KEY_FILE = os.environ.get("NEWS_MODEL_SERVER_KEY_FILE", "model_server.key")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+MODEL_SERVER_CONNECT_TIMEOUT = float(os.environ.get("NEWS_MODEL_SERVER_CONNECT_TIMEOUT", 30))
+MAX_BATCH_TEXTS = int(os.environ.get("NEWS_MODEL_SERVER_MAX_BATCH", 64))
+MAX_BATCH_WAIT_MS = float(os.environ.get("NEWS_MODEL_SERVER_MAX_WAIT_MS", 5))
+FORWARD_BATCH_SIZE = int(os.environ.get("NEWS_SENTIMENT_BATCH_SIZE", 16))
+
+
+def parse_address(address):
+    """"host:port" becomes a TCP address; anything else is a Unix socket path"""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def load_authkey(create=False, key=MODEL_SERVER_KEY, path=MODEL_SERVER_KEY_FILE):
+    """
+    Return the shared secret: key if given, else the contents of the key file.
+    With create, a missing key file is filled with a new random key that only
+    its owner can read. Key files readable by other users are refused.
+    """
+    if key:
+        return key.encode("utf-8")
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+            print(f"Wrote a new model server key to {path}")
+    try:
+        if os.name == "posix" and os.stat(path).st_mode & 0o077:
+            raise RuntimeError(f"Model server key file {path} is readable by other users; chmod 600 it")
+        with open(path, "rb") as f:
+            authkey = f.read().strip()
+    except FileNotFoundError:
+        raise RuntimeError(f"No model server key: set NEWS_MODEL_SERVER_KEY or start the server "
+                           f"to create {path}") from None
+    if not authkey:
+        raise RuntimeError(f"Model server key file {path} is empty")
+    return authkey
+
+
+class _PendingRequest:
+    def __init__(self, texts):
+        self.texts = texts
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class ModelServer:
+    """
+    Serve one sentiment analyzer to many clients. Each connection is handled
+    on its own thread; a single batching thread collects texts from all
+    waiting requests (up to max_batch texts or max_wait_ms after the first
+    arrives) and scores them in length-sorted forward passes.
+    """
+
+    def __init__(self, analyzer, address=DEFAULT_LISTEN_ADDRESS, authkey=None,
+                 max_batch=MAX_BATCH_TEXTS, max_wait_ms=MAX_BATCH_WAIT_MS, batch_size=FORWARD_BATCH_SIZE,
+                 model_id=SENTIMENT_MODEL, backend=INFERENCE_BACKEND):
+        self.analyzer = analyzer
+        self.address = parse_address(address)
+        self.authkey = authkey if authkey is not None else load_authkey(create=True)
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batch_size = max(1, batch_size)
+        self.model_id = model_id
+        self.backend = backend
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+
+    def serve_forever(self):
+        if isinstance(self.address, str):
+            # A socket file left behind by a previous run would make the bind fail
+            try:
+                if stat.S_ISSOCK(os.stat(self.address).st_mode):
+                    os.unlink(self.address)
+            except FileNotFoundError:
+                pass
+        elif self.address[0] not in LOOPBACK_HOSTS:
+            print(f"Warning: model server is reachable from other hosts at {self.address}; "
+                  "anyone holding the key can run code in this process")
+        threading.Thread(target=self._batch_loop, name="model-batcher", daemon=True).start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)
+            print(f"Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # Failed handshakes (wrong authkey, dropped clients) must not stop the server
+                    print(f"Error accepting model server connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="model-conn", daemon=True).start()
+
+    def stats(self):
+        """Return request, batch and text counters"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_texts": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "queued": self._queue.qsize()
+            }
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = message.get("op")
+                if op == "predict":
+                    request = _PendingRequest(list(message["texts"]))
+                    self._queue.put(request)
+                    request.done.wait()
+                    reply = {"ok": request.error is None, "results": request.results, "error": request.error}
+                elif op == "info":
+                    reply = {"ok": True, "model_id": self.model_id, "backend": self.backend}
+                elif op == "stats":
+                    reply = {"ok": True, "stats": self.stats()}
+                else:
+                    reply = {"ok": False, "error": f"Unknown operation: {op}"}
+                try:
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    def _batch_loop(self):
+        while True:
+            requests = [self._queue.get()]
+            count = len(requests[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                count += len(request.texts)
+            self._run_batch(requests)
+
+    def _predict(self, texts):
+        results = [None] * len(texts)
+        # Length-sorted forward passes pad each batch to a similar length
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            predictions = self.analyzer([texts[i] for i in chunk], batch_size=len(chunk), truncation=True)
+            for i, prediction in zip(chunk, predictions):
+                results[i] = {"label": prediction["label"], "score": float(prediction["score"])}
+        return results
+
+    def _run_batch(self, requests):
+        texts = [text for request in requests for text in request.texts]
+        try:
+            results = self._predict(texts)
+            position = 0
+            for request in requests:
+                request.results = results[position:position + len(request.texts)]
+                position += len(request.texts)
+        except Exception as e:
+            # Rerun each request alone so one bad input only fails its own request
+            print(f"Error in model server batch, retrying its requests separately: {e}")
+            for request in requests:
+                try:
+                    request.results = self._predict(request.texts)
+                except Exception as e:
+                    request.error = str(e)
+
+        with self._lock:
+            self.requests += len(requests)
+            self.batches += 1
+            self.texts += len(texts)
+        for request in requests:
+            request.done.set()
+
+
+class RemoteSentimentPipeline:
+    """
+    Client for ModelServer with the call signature of a transformers
+    sentiment pipeline. Each thread keeps its own connection so concurrent
+    callers reach the server together and share its micro-batches. Only the
+    tokenizer (for token windows) is loaded locally.
+    """
+
+    def __init__(self, address=MODEL_SERVER_ADDRESS, authkey=None,
+                 connect_timeout=MODEL_SERVER_CONNECT_TIMEOUT):
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self._local = threading.local()
+        self._tokenizer = None
+        self._tokenizer_loaded = False
+        self._tokenizer_lock = threading.Lock()
+        # Wait for a model server that is still starting alongside its clients
+        info = self._request({"op": "info"}, connect_timeout)
+        self.model_id = info["model_id"]
+        self.backend = info["backend"]
+
+    @property
+    def tokenizer(self):
+        """The model's tokenizer, loaded on first use; None if unavailable"""
+        with self._tokenizer_lock:
+            if not self._tokenizer_loaded:
+                try:
+                    from transformers import AutoTokenizer
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+                except Exception as e:
+                    print(f"Error loading tokenizer for {self.model_id}: {e}")
+                self._tokenizer_loaded = True
+            return self._tokenizer
+
+    def __call__(self, texts, batch_size=None, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        return self._request({"op": "predict", "texts": list(texts)})["results"]
+
+    def stats(self):
+        return self._request({"op": "stats"})["stats"]
+
+    def _connection(self, connect_timeout=0):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                # The key file only appears once the server has started
+                if self.authkey is None:
+                    self.authkey = load_authkey()
+                conn = Client(self.address, authkey=self.authkey)
+                break
+            except (ConnectionError, FileNotFoundError, RuntimeError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+        self._local.conn = conn
+        return conn
+
+    def _request(self, message, connect_timeout=0):
+        for attempt in range(2):
+            conn = self._connection(connect_timeout)
+            try:
+                conn.send(message)
+                reply = conn.recv()
+                break
+            except (EOFError, OSError):
+                # The server restarted or dropped us; reconnect once
+                self._local.conn = None
+                conn.close()
+                if attempt:
+                    raise
+        if not reply.get("ok"):
+            raise RuntimeError(f"Model server error: {reply.get('error')}")
+        return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sentiment model to local workers")
+    parser.add_argument("--address", default=MODEL_SERVER_ADDRESS or DEFAULT_LISTEN_ADDRESS,
+                        help="host:port or a Unix socket path")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND, choices=BACKENDS)
+    parser.add_argument("--model", default=SENTIMENT_MODEL)
+    parser.add_argument("--threads", type=int, default=INFERENCE_THREADS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_TEXTS)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_BATCH_WAIT_MS)
+    parser.add_argument("--batch-size", type=int, default=FORWARD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"Loading sentiment model ({args.backend}, {args.model})...")
+    analyzer = load_sentiment_backend(args.backend, args.model, args.threads)
+    ModelServer(analyzer, args.address, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                batch_size=args.batch_size, model_id=args.model, backend=args.backend).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
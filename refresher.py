@@ -0,0 +1,143 @@
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Watchlist refresh defaults, overridable from the environment
+DEFAULT_WATCHLIST = "Apple,Microsoft,Google,Amazon,Tesla,Facebook,Netflix,IBM,Intel,AMD"
+REFRESH_ENABLED = os.environ.get("NEWS_REFRESH_ENABLED", "0") == "1"
+REFRESH_WATCHLIST = [name.strip() for name in os.environ.get("NEWS_WATCHLIST", DEFAULT_WATCHLIST).split(",")
+                     if name.strip()]
+# Keep the interval below NEWS_CACHE_TTL so hot entries are replaced before they expire
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("NEWS_REFRESH_INTERVAL", 600))
+# Each interval is randomized by +/- this fraction so refreshes do not synchronize
+REFRESH_JITTER = float(os.environ.get("NEWS_REFRESH_JITTER", 0.1))
+REFRESH_CONCURRENCY = int(os.environ.get("NEWS_REFRESH_CONCURRENCY", 2))
+REFRESH_MAX_ARTICLES = int(os.environ.get("NEWS_REFRESH_MAX_ARTICLES", 5))
+REFRESH_TTS = os.environ.get("NEWS_REFRESH_TTS", "0") == "1"
+
+
+class WatchlistRefresher:
+    """
+    Background scheduler that recomputes the analysis of watchlist companies
+    every interval (with jitter) and publishes it into the scraper's result
+    cache, optionally pre-synthesizing the TTS audio too. At most concurrency
+    companies are refreshed at once, and a company is never refreshed twice
+    concurrently.
+    """
+
+    def __init__(self, scraper, watchlist=None, interval=REFRESH_INTERVAL_SECONDS, jitter=REFRESH_JITTER,
+                 concurrency=REFRESH_CONCURRENCY, max_articles=REFRESH_MAX_ARTICLES, tts=REFRESH_TTS):
+        self.scraper = scraper
+        self.watchlist = list(dict.fromkeys(watchlist if watchlist is not None else REFRESH_WATCHLIST))
+        self.interval = max(1.0, interval)
+        self.jitter = min(max(0.0, jitter), 0.9)
+        self.concurrency = max(1, concurrency)
+        self.max_articles = max_articles
+        self.tts = tts
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopped = False
+        self._thread = None
+        self._executor = None
+        self._schedule = []
+        self._running = set()
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refreshed = {}
+
+        ttl = getattr(scraper.result_cache, "ttl", None)
+        if ttl and ttl < self.freshness_bound():
+            print(f"Warning: result cache TTL ({ttl}s) is shorter than the refresh bound "
+                  f"({self.freshness_bound():.0f}s); watchlist entries can expire between refreshes")
+
+    def freshness_bound(self):
+        """
+        Longest gap between two refreshes of the same company, in seconds,
+        not counting the refresh itself (the next interval starts when it ends)
+        """
+        return self.interval * (1 + self.jitter)
+
+    def start(self):
+        """Start refreshing; the first round is spread over a short jittered delay"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="news-refresh")
+            now = time.monotonic()
+            for name in self.watchlist:
+                heapq.heappush(self._schedule, (now + random.uniform(0, self.interval * self.jitter), name))
+            self._thread = threading.Thread(target=self._run, name="news-refresher", daemon=True)
+            self._thread.start()
+        print(f"Refreshing {len(self.watchlist)} watchlist companies every ~{self.interval:.0f}s")
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def refresh(self, company_name):
+        """Recompute one company now and publish it into the result cache"""
+        try:
+            # use_cache=False forces a fresh run; process_company_news caches non-degraded results
+            result = self.scraper.process_company_news(company_name, self.max_articles, use_cache=False)
+            if self.tts:
+                self.scraper.text_to_hindi_speech(self.scraper.build_tts_summary(result))
+            with self._lock:
+                self.refreshes += 1
+                self.last_refreshed[company_name] = time.time()
+        except Exception as e:
+            print(f"Error refreshing {company_name}: {e}")
+            with self._lock:
+                self.failures += 1
+
+    def stats(self):
+        """Return the schedule settings, refresh counters and last refresh times"""
+        with self._lock:
+            return {
+                "watchlist": list(self.watchlist),
+                "interval_seconds": self.interval,
+                "jitter": self.jitter,
+                "concurrency": self.concurrency,
+                "freshness_bound_seconds": round(self.freshness_bound(), 1),
+                "tts": self.tts,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "running": sorted(self._running),
+                "last_refreshed": dict(self.last_refreshed)
+            }
+
+    def _next_delay(self):
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        with self._wakeup:
+            while not self._stopped:
+                now = time.monotonic()
+                due_at, name = self._schedule[0] if self._schedule else (now + self.interval, None)
+                # Wait for the next due company or a free slot in the concurrency budget
+                if due_at > now or len(self._running) >= self.concurrency:
+                    self._wakeup.wait(timeout=max(0.0, due_at - now) if due_at > now else None)
+                    continue
+                # A running company is only rescheduled once its refresh ends
+                heapq.heappop(self._schedule)
+                self._running.add(name)
+                try:
+                    self._executor.submit(self._refresh_and_reschedule, name)
+                except RuntimeError:
+                    # The executor was shut down by stop()
+                    return
+
+    def _refresh_and_reschedule(self, name):
+        try:
+            self.refresh(name)
+        finally:
+            with self._wakeup:
+                self._running.discard(name)
+                # The next interval starts when this refresh ends
+                heapq.heappush(self._schedule, (time.monotonic() + self._next_delay(), name))
+                self._wakeup.notify_all()
@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+from article_store import canonical_url
+from http_client import response_html
+from metrics import record_error, time_stage
+
+# News search defaults, overridable from the environment
+SEARCH_PROVIDERS = [name.strip() for name in os.environ.get("NEWS_SEARCH_PROVIDERS", "google_html,bing_rss").split(",")
+                    if name.strip()]
+# Providers that have not answered within this many seconds are left out of the results
+SEARCH_DEADLINE_SECONDS = float(os.environ.get("NEWS_SEARCH_DEADLINE", 4.0))
+# Reciprocal rank fusion constant: higher values flatten the advantage of top positions
+RANK_FUSION_K = 60
+
+
+def unwrap_redirect(url, params=("url", "q", "u")):
+    """Return the target of a search engine redirect link, or url itself"""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    for param in params:
+        for value in query.get(param, ()):
+            if value.startswith(("http://", "https://")):
+                return value
+    return url
+
+
+def filter_links(links, domains=None):
+    """Keep http(s) links whose host is in domains (any host if None), in order and without duplicates"""
+    kept = []
+    seen = set()
+    for url in links:
+        if not url.startswith(("http://", "https://")):
+            continue
+        host = (urlsplit(url).hostname or "").lower()
+        if domains is not None and not any(host == domain or host.endswith("." + domain) for domain in domains):
+            continue
+        key = canonical_url(url)
+        if key not in seen:
+            seen.add(key)
+            kept.append(url)
+    return kept
+
+
+def parse_anchor_links(html, domains=None):
+    """
+    Extract result links from a search page with lxml's C parser, reading
+    only anchor hrefs and unwrapping search engine redirect links
+    """
+    import lxml.html
+
+    if not html or not html.strip():
+        return []
+    tree = lxml.html.fromstring(html)
+    links = [unwrap_redirect(href) for href in tree.xpath("//a/@href")]
+    return filter_links(links, domains)
+
+
+class SearchProvider:
+    """
+    Interface for a news search source. search() returns article URLs for a
+    query, best first; it may raise, and the aggregator treats that as no results.
+    timeout is the time left before the search deadline, so fetches should
+    make a single attempt within it.
+    """
+
+    name = None
+
+    def search(self, query, http_client, timeout):
+        raise NotImplementedError
+
+
+class HTMLSearchProvider(SearchProvider):
+    """Search result page whose article links are read from its anchors"""
+
+    def __init__(self, name, url_template):
+        self.name = name
+        self.url_template = url_template
+
+    def search(self, query, http_client, timeout):
+        url = self.url_template.format(query=quote_plus(query))
+        response = http_client.get(url, timeout=timeout, retry=False)
+        response.raise_for_status()
+        return parse_anchor_links(response_html(response))
+
+
+class RSSSearchProvider(SearchProvider):
+    """RSS/Atom search feed parsed with feedparser"""
+
+    def __init__(self, name, url_template):
+        self.name = name
+        self.url_template = url_template
+
+    def search(self, query, http_client, timeout):
+        import feedparser
+
+        url = self.url_template.format(query=quote_plus(query))
+        # Fetch through the shared client for pooling and a timeout; feedparser only parses
+        response = http_client.get(url, timeout=timeout, retry=False)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+        return [unwrap_redirect(entry.link) for entry in feed.entries if entry.get("link")]
+
+
+SEARCH_PROVIDER_REGISTRY = {
+    "google_html": lambda: HTMLSearchProvider("google_html", "https://www.google.com/search?q={query}&tbm=nws"),
+    "bing_rss": lambda: RSSSearchProvider("bing_rss", "https://www.bing.com/news/search?q={query}&format=rss"),
+    "google_rss": lambda: RSSSearchProvider("google_rss",
+                                            "https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"),
+}
+
+
+def get_search_providers(names=None):
+    """Return search provider instances by name"""
+    providers = []
+    for name in names if names is not None else SEARCH_PROVIDERS:
+        try:
+            providers.append(SEARCH_PROVIDER_REGISTRY[name]())
+        except KeyError:
+            raise ValueError(f"Unknown search provider: {name}") from None
+    return providers
+
+
+class SearchAggregator:
+    """
+    Query every provider at once and merge what arrives before a shared
+    deadline. Results are keyed by canonical URL and ranked by reciprocal
+    rank fusion, so links that several providers rank highly come first.
+    Each search runs its providers on threads of its own, so a slow provider
+    in one search never delays another search. Providers still running at the
+    deadline finish in the background (their fetches make one attempt within
+    the time that was left) and their results are discarded.
+    """
+
+    def __init__(self, http_client, providers=None, deadline=SEARCH_DEADLINE_SECONDS, domains=None):
+        self.http_client = http_client
+        self.providers = providers if providers is not None else get_search_providers()
+        self.deadline = max(0.1, deadline)
+        self.domains = domains
+        self._lock = threading.Lock()
+        self._stats = {provider.name: {"answered": 0, "failed": 0, "timed_out": 0, "links": 0}
+                       for provider in self.providers}
+
+    def search(self, query, max_results=None):
+        """
+        Return (links, answered): merged article URLs, best first, and the
+        number of providers that answered before the deadline
+        """
+        started = time.monotonic()
+        deadline = started + self.deadline
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.providers)), thread_name_prefix="news-search")
+        try:
+            futures = {executor.submit(self._run_provider, provider, query, deadline): provider
+                       for provider in self.providers}
+            done, _ = wait(futures, timeout=self.deadline)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        scores = {}
+        first_seen = {}
+        answered = 0
+        for future, provider in futures.items():
+            if future not in done:
+                self._count(provider.name, "timed_out")
+                continue
+            links = future.result()
+            if links is None:
+                continue
+            answered += 1
+            for rank, url in enumerate(filter_links(links, self.domains)):
+                key = canonical_url(url)
+                first_seen.setdefault(key, url)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (RANK_FUSION_K + rank + 1)
+
+        order = {key: index for index, key in enumerate(first_seen)}
+        ranked = sorted(scores, key=lambda key: (-scores[key], order[key]))
+        links = [first_seen[key] for key in ranked]
+        print(f"Search providers: {answered}/{len(self.providers)} answered in {time.monotonic() - started:.2f}s")
+        return (links[:max_results] if max_results is not None else links), answered
+
+    def _run_provider(self, provider, query, deadline):
+        """Run one provider; returns its links, or None if it failed"""
+        try:
+            with time_stage(f"search_{provider.name}"):
+                links = provider.search(query, self.http_client, max(0.1, deadline - time.monotonic()))
+        except Exception as e:
+            print(f"Error from search provider {provider.name}: {e}")
+            record_error(f"search_{provider.name}")
+            self._count(provider.name, "failed")
+            return None
+        # Late answers were already counted as timed out
+        if time.monotonic() <= deadline:
+            self._count(provider.name, "answered")
+            self._count(provider.name, "links", len(links))
+        return links
+
+    def _count(self, name, field, amount=1):
+        with self._lock:
+            self._stats[name][field] += amount
+
+    def stats(self):
+        """Return per-provider answered, failed and timed-out counts and links returned"""
+        with self._lock:
+            return {
+                "deadline_seconds": self.deadline,
+                "providers": {name: dict(counts) for name, counts in self._stats.items()}
+            }
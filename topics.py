@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import re
+
+from lexicon import INFLECTION_SUFFIX
+
+# Optional JSON taxonomy file: {"Topic": ["synonym", ...]} or ["Topic", ...]
+TAXONOMY_PATH = os.environ.get("NEWS_TOPIC_TAXONOMY") or None
+
+# Common financial and business topics to look for
+DEFAULT_TAXONOMY = [
+    "Stock Market", "Innovation", "Revenue", "Profit", "Loss",
+    "Investment", "Expansion", "Regulations", "Competition",
+    "Product Launch", "Partnership", "Acquisition", "Layoffs",
+    "Sustainability", "Growth", "Technology", "Leadership",
+    "Electric Vehicles", "Autonomous Vehicles", "Renewable Energy"
+]
+
+
+def _normalize(phrase):
+    return " ".join(phrase.lower().split())
+
+
+def _trie_pattern(phrases):
+    """
+    Build a prefix-factored regex matching any of phrases, so matching cost
+    grows with text length rather than with the number of phrases
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        is_end = "" in node
+        branches = [(r"\s+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+
+class TopicIndex:
+    """
+    Topic matcher compiled once from a taxonomy of topics and synonyms.
+    All topics are found in a single case-insensitive pass over the text and
+    returned in taxonomy order. Phrases match whole words, optionally followed
+    by a simple inflection (s, es, ed, d, ing).
+    """
+
+    def __init__(self, taxonomy=None):
+        if taxonomy is None:
+            taxonomy = DEFAULT_TAXONOMY
+        if not isinstance(taxonomy, dict):
+            taxonomy = {topic: [] for topic in taxonomy}
+
+        self.topics = list(taxonomy)
+        self._order = {topic: i for i, topic in enumerate(self.topics)}
+        self._synonyms = {}
+        for topic, synonyms in taxonomy.items():
+            for phrase in [topic] + list(synonyms or []):
+                phrase = _normalize(phrase)
+                if phrase:
+                    # The first topic listing a synonym owns it
+                    self._synonyms.setdefault(phrase, topic)
+
+        # Identifies the taxonomy, so stored results can be tied to it
+        self.fingerprint = hashlib.sha1(json.dumps([self.topics, sorted(self._synonyms.items()), INFLECTION_SUFFIX])
+                                        .encode("utf-8")).hexdigest()
+
+        pattern = _trie_pattern(sorted(self._synonyms)) if self._synonyms else r"(?!x)x"
+        # Simple inflections are accepted as in the lexicon, so "Acquisition" matches "acquisitions"
+        self._pattern = re.compile(rf"(?<!\w)({pattern}){INFLECTION_SUFFIX}(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def load(cls, path=TAXONOMY_PATH):
+        """Build an index from a JSON taxonomy file, or the default taxonomy if path is None"""
+        if not path:
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text):
+        """Return the topics mentioned in text, in taxonomy order"""
+        found = {self._synonyms[_normalize(m.group(1))] for m in self._pattern.finditer(text or "")}
+        return sorted(found, key=self._order.__getitem__)
+
+    def match_batch(self, texts):
+        """Return matched topics for each text, in input order"""
+        return [self.match(text) for text in texts]
@@ -0,0 +1,157 @@
+import io
+import os
+import re
+import shutil
+import struct
+import subprocess
+import wave
+
+# Text-to-speech defaults, overridable from the environment
+TTS_BACKEND = os.environ.get("NEWS_TTS_BACKEND", "gtts")
+# Narrations longer than this are split on sentence boundaries and synthesized in parallel
+TTS_CHUNK_CHARS = int(os.environ.get("NEWS_TTS_CHUNK_CHARS", 300))
+TTS_WORKERS = int(os.environ.get("NEWS_TTS_WORKERS", 4))
+# Include article titles and summaries in the narration, not just the overall sentiment
+TTS_NARRATE_ARTICLES = os.environ.get("NEWS_TTS_NARRATE_ARTICLES", "1") == "1"
+
+# Latin and Devanagari (danda) sentence ends
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+
+def split_tts_chunks(text, max_chars=TTS_CHUNK_CHARS):
+    """
+    Split text into chunks of whole sentences of at most max_chars characters.
+    Sentences longer than max_chars are split on word boundaries.
+    """
+    max_chars = max(1, max_chars)
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_END.split(" ".join(text.split())):
+        pieces = [sentence]
+        if len(sentence) > max_chars:
+            pieces, piece = [], ""
+            for word in sentence.split(" "):
+                if piece and len(piece) + 1 + len(word) > max_chars:
+                    pieces.append(piece)
+                    piece = word
+                else:
+                    piece = f"{piece} {word}" if piece else word
+            pieces.append(piece)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+
+class TTSBackend:
+    """
+    Interface for speech synthesis engines. synthesize() writes one chunk of
+    speech to a file; concatenate() and stream_part() join chunks, which for
+    MP3 is plain byte concatenation of the frames.
+    """
+
+    name = None
+    extension = "mp3"
+    media_type = "audio/mpeg"
+
+    def synthesize(self, text, lang, path):
+        raise NotImplementedError
+
+    def concatenate(self, part_paths, path):
+        """Join synthesized chunks into one audio file"""
+        with open(path, "wb") as out:
+            for part_path in part_paths:
+                with open(part_path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+    def stream_part(self, part_path, first):
+        """Bytes to send for one chunk when streaming the joined audio"""
+        with open(part_path, "rb") as f:
+            return f.read()
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS (needs network access)"""
+
+    name = "gtts"
+
+    def synthesize(self, text, lang, path):
+        from gtts import gTTS
+        gTTS(text=text, lang=lang).save(path)
+
+
+class WavBackend(TTSBackend):
+    """Base for engines producing PCM WAV, which needs header-aware joining"""
+
+    extension = "wav"
+    media_type = "audio/wav"
+
+    def concatenate(self, part_paths, path):
+        with wave.open(path, "wb") as out:
+            for index, part_path in enumerate(part_paths):
+                with wave.open(part_path, "rb") as part:
+                    if index == 0:
+                        out.setparams(part.getparams())
+                    out.writeframes(part.readframes(part.getnframes()))
+
+    def stream_part(self, part_path, first):
+        with wave.open(part_path, "rb") as part:
+            frames = part.readframes(part.getnframes())
+            if not first:
+                return frames
+            channels, width, rate = part.getnchannels(), part.getsampwidth(), part.getframerate()
+        # The total length is unknown while streaming, so declare the maximum as streaming encoders do
+        header = (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE" +
+                  b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, rate, rate * channels * width,
+                                        channels * width, width * 8) +
+                  b"data" + struct.pack("<I", 0xFFFFFFFF - 36))
+        return header + frames
+
+
+class EspeakBackend(WavBackend):
+    """Local offline synthesis with the espeak-ng (or espeak) command line engine"""
+
+    name = "espeak"
+
+    def __init__(self, executable=None):
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak") or "espeak-ng"
+
+    def synthesize(self, text, lang, path):
+        subprocess.run([self.executable, "-v", lang, "-w", path, text],
+                       check=True, capture_output=True, timeout=120)
+
+
+class StubBackend(WavBackend):
+    """Silent WAV audio whose length follows the text, for tests and benchmarks"""
+
+    name = "stub"
+
+    def __init__(self, seconds_per_char=0.01, rate=8000):
+        self.seconds_per_char = seconds_per_char
+        self.rate = rate
+
+    def synthesize(self, text, lang, path):
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.rate)
+            out.writeframes(b"\x00\x00" * int(len(text) * self.seconds_per_char * self.rate))
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+
+TTS_BACKENDS = {backend.name: backend for backend in (GTTSBackend, EspeakBackend, StubBackend)}
+
+
+def get_tts_backend(name=TTS_BACKEND):
+    """Return a TTS backend instance by name"""
+    try:
+        return TTS_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend: {name}") from None
@@ -1,51 +1,216 @@
-import requests
-from bs4 import BeautifulSoup
-import newspaper
-from newspaper import Article
-import nltk
-from transformers import pipeline
-import pandas as pd
 import json
 import os
-from gtts import gTTS
-from collections import Counter
-import re
-
-# Download NLTK data
-nltk.download('punkt')
-
-import requests
-from bs4 import BeautifulSoup
-import newspaper
-from newspaper import Article
-import nltk
-from transformers import pipeline
-import pandas as pd
-import json
-import os
-from gtts import gTTS
 from collections import Counter
 import re
 import random
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from cache import ResultCache
+from audio_store import AudioStore
+from tts import get_tts_backend, split_tts_chunks, TTS_BACKEND, TTS_CHUNK_CHARS, TTS_WORKERS, TTS_NARRATE_ARTICLES
+from http_client import get_http_client, response_html
+from lexicon import SentimentLexicon
+from topics import TopicIndex
+from article_store import ArticleStore, ARTICLE_DB_PATH, content_hash
+from history_store import SentimentHistory, HISTORY_DB_PATH
+from extraction import extract_main_text, summarize, extract_keywords
+from search import SearchAggregator, parse_anchor_links
+from dedup import simhash, NearDuplicateIndex, DEDUP_ENABLED, DEDUP_MAX_DISTANCE, DEDUP_COUNT_DUPLICATES
+from inference import load_sentiment_backend, BACKENDS, INFERENCE_BACKEND, SENTIMENT_MODEL, INFERENCE_THREADS
+from model_server import RemoteSentimentPipeline, MODEL_SERVER_ADDRESS
+from metrics import time_stage, record_error, record_fallback, record_response, record_near_duplicates
+import hashlib
+import shutil
 
-# Download NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-except:
-    print("Could not download NLTK data. Using fallbacks.")
+# Heavy dependencies (transformers, newspaper, nltk, gtts) are imported lazily
+# so importing this module is fast and never touches the network.
+
+# Offline mode: use only locally cached NLTK data and model files
+OFFLINE_MODE = os.environ.get("NEWS_OFFLINE", "0") == "1"
+if OFFLINE_MODE:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+def ensure_nltk_data(offline=OFFLINE_MODE):
+    """Make sure the NLTK punkt tokenizer is available, downloading it unless offline"""
+    try:
+        import nltk
+        nltk.data.find('tokenizers/punkt')
+        return True
+    except LookupError:
+        pass
+    except Exception as e:
+        print(f"Could not load NLTK: {e}")
+        return False
+    
+    if offline:
+        print("NLTK punkt data not found locally (offline mode). Using fallbacks.")
+        return False
+    try:
+        return bool(nltk.download('punkt', quiet=True))
+    except Exception:
+        print("Could not download NLTK data. Using fallbacks.")
+        return False
+
+# Popular news domains accepted from search results
+GENERAL_NEWS_DOMAINS = [
+    "bbc.com", "nytimes.com", "wsj.com", "forbes.com",
+    "ft.com", "cnbc.com", "reuters.com", "bloomberg.com"
+]
+
+# Article extraction tier: "full" or "fast"
+EXTRACTION_TIER = os.environ.get("NEWS_EXTRACTION_TIER", "full")
+
+# Concurrency limits for the article fetch stage
+MAX_FETCH_WORKERS = int(os.environ.get("NEWS_MAX_FETCH_WORKERS", 8))
+MAX_FETCH_PER_HOST = int(os.environ.get("NEWS_MAX_FETCH_PER_HOST", 2))
+
+# Number of texts sent through the sentiment model per forward pass
+SENTIMENT_BATCH_SIZE = int(os.environ.get("NEWS_SENTIMENT_BATCH_SIZE", 16))
+
+# Long-document mode: score overlapping token windows instead of the first 512 characters
+LONG_DOCUMENT_MODE = os.environ.get("NEWS_LONG_DOCUMENT", "1") == "1"
+MAX_WINDOWS_PER_ARTICLE = int(os.environ.get("NEWS_MAX_WINDOWS_PER_ARTICLE", 4))
+WINDOW_OVERLAP_TOKENS = int(os.environ.get("NEWS_WINDOW_OVERLAP_TOKENS", 64))
+# Aggregated scores closer to zero than this are reported as Neutral
+NEUTRAL_MARGIN = float(os.environ.get("NEWS_NEUTRAL_MARGIN", 0.2))
 
 class NewsScraper:
-    def __init__(self):
-        # Initialize with better error handling
-        try:
-            print("Initializing sentiment analyzer...")
-            self.sentiment_analyzer = pipeline("sentiment-analysis")
-            print("Sentiment analyzer initialized successfully")
-        except Exception as e:
-            print(f"Error initializing sentiment analyzer: {e}")
-            self.sentiment_analyzer = None
-            print("Using fallback sentiment analysis")
+    def __init__(self, max_workers=MAX_FETCH_WORKERS, max_per_host=MAX_FETCH_PER_HOST,
+                 batch_size=SENTIMENT_BATCH_SIZE, long_document=LONG_DOCUMENT_MODE,
+                 max_windows=MAX_WINDOWS_PER_ARTICLE, window_overlap=WINDOW_OVERLAP_TOKENS,
+                 neutral_margin=NEUTRAL_MARGIN, result_cache=None, audio_store=None,
+                 http_client=None, lexicon=None, topic_index=None, article_store=None,
+                 extraction_tier=EXTRACTION_TIER, inference_backend=INFERENCE_BACKEND,
+                 model_id=SENTIMENT_MODEL, inference_threads=INFERENCE_THREADS,
+                 model_server=MODEL_SERVER_ADDRESS, history=None, tts_backend=None,
+                 tts_chunk_chars=TTS_CHUNK_CHARS, tts_workers=TTS_WORKERS, narrate_articles=TTS_NARRATE_ARTICLES,
+                 dedup=DEDUP_ENABLED, dedup_max_distance=DEDUP_MAX_DISTANCE,
+                 count_duplicates=DEDUP_COUNT_DUPLICATES, search=None):
+        if extraction_tier not in ("full", "fast"):
+            raise ValueError(f"Unknown extraction tier: {extraction_tier}")
+        if inference_backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {inference_backend}")
+        self.extraction_tier = extraction_tier
+        self.inference_backend = inference_backend
+        self.model_id = model_id
+        self.inference_threads = inference_threads
+        self.model_server = model_server
+        self.max_workers = max(1, max_workers)
+        # Every fetch path submits here, so max_workers bounds downloads across all requests
+        self._fetch_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="news-fetch")
+        self.max_per_host = max(1, max_per_host)
+        self.batch_size = max(1, batch_size)
+        self.long_document = long_document
+        self.max_windows = max(1, max_windows)
+        self.window_overlap = max(0, window_overlap)
+        self.neutral_margin = neutral_margin
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.tts_backend = tts_backend if tts_backend is not None else get_tts_backend(TTS_BACKEND)
+        self.tts_chunk_chars = tts_chunk_chars
+        self.tts_workers = max(1, tts_workers)
+        # Shared by all narrations so concurrent requests cannot multiply synthesis threads
+        self._tts_executor = ThreadPoolExecutor(max_workers=self.tts_workers, thread_name_prefix="news-tts")
+        self.narrate_articles = narrate_articles
+        self.dedup = dedup
+        self.dedup_max_distance = dedup_max_distance
+        self.count_duplicates = count_duplicates
+        self.audio_store = audio_store if audio_store is not None else AudioStore(extension=self.tts_backend.extension)
+        self.http_client = http_client if http_client is not None else get_http_client()
+        self.search = search if search is not None else SearchAggregator(self.http_client,
+                                                                         domains=GENERAL_NEWS_DOMAINS)
+        self.lexicon = lexicon if lexicon is not None else SentimentLexicon.load()
+        self.topic_index = topic_index if topic_index is not None else TopicIndex.load()
+        if article_store is None and ARTICLE_DB_PATH:
+            article_store = ArticleStore()
+        self.article_store = article_store
+        if history is None and HISTORY_DB_PATH:
+            history = SentimentHistory()
+        self.history = history
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        
+        # The sentiment model is loaded on first use or by warmup()
+        self._sentiment_analyzer = None
+        self._model_loaded = False
+        self._nltk_ready = None
+        self._load_lock = threading.Lock()
+        self._warmed_up = False
+    
+    @property
+    def sentiment_analyzer(self):
+        """The sentiment pipeline, loaded on first access; None if unavailable"""
+        if not self._model_loaded:
+            self._load_sentiment_analyzer()
+        return self._sentiment_analyzer
+    
+    @sentiment_analyzer.setter
+    def sentiment_analyzer(self, analyzer):
+        self._sentiment_analyzer = analyzer
+        self._model_loaded = True
+    
+    def _load_sentiment_analyzer(self):
+        """Load the sentiment pipeline once, falling back to keyword analysis on failure"""
+        with self._load_lock:
+            if self._model_loaded:
+                return
+            # Initialize with better error handling
+            try:
+                if self.model_server:
+                    # Share one model process instead of loading a copy per worker
+                    print(f"Connecting to sentiment model server at {self.model_server}...")
+                    self._sentiment_analyzer = RemoteSentimentPipeline(self.model_server)
+                else:
+                    print(f"Initializing sentiment analyzer ({self.inference_backend}, {self.model_id})...")
+                    self._sentiment_analyzer = load_sentiment_backend(self.inference_backend, self.model_id,
+                                                                      self.inference_threads)
+                print("Sentiment analyzer initialized successfully")
+            except Exception as e:
+                print(f"Error initializing sentiment analyzer: {e}")
+                self._sentiment_analyzer = None
+                print("Using fallback sentiment analysis")
+            self._model_loaded = True
+    
+    def _ensure_nltk(self):
+        """Check NLTK data once per scraper"""
+        if self._nltk_ready is None:
+            self._nltk_ready = ensure_nltk_data()
+        return self._nltk_ready
+    
+    def warmup(self):
+        """
+        Load the sentiment model and NLTK data and run one inference so the
+        first real request does not pay for initialization
+        """
+        self._ensure_nltk()
+        analyzer = self.sentiment_analyzer
+        if analyzer is not None:
+            try:
+                analyzer(["Warmup sentence."])
+            except Exception as e:
+                print(f"Error during sentiment analyzer warmup: {e}")
+        self._warmed_up = True
+        return self.readiness()
+    
+    def readiness(self):
+        """
+        Report whether the scraper is initialized (by warmup() or by the lazy
+        loading of the first request) and which components are available
+        """
+        # NLTK data is only used by the full extraction tier
+        nltk_checked = self._nltk_ready is not None or self.extraction_tier != "full"
+        return {
+            "ready": self._warmed_up or (self._model_loaded and nltk_checked),
+            "model_loaded": self._model_loaded and self._sentiment_analyzer is not None,
+            # With a model server these describe the server's model
+            "inference_backend": getattr(self._sentiment_analyzer, "backend", self.inference_backend),
+            "model_id": getattr(self._sentiment_analyzer, "model_id", self.model_id),
+            "model_server": self.model_server or None,
+            "nltk_data": bool(self._nltk_ready),
+            "offline": OFFLINE_MODE
+        }
         
     def search_news(self, company_name, max_articles=5):
         """
@@ -63,80 +228,158 @@ class NewsScraper:
                 f"https://www.bloomberg.com/search?query={company_name}"
             ]
             
-            # Add some popular news domains for backup
-            general_domains = [
-                "bbc.com", "nytimes.com", "wsj.com", "forbes.com", 
-                "ft.com", "cnbc.com", "reuters.com", "bloomberg.com"
-            ]
-            
-            # Try Google News with a better approach
-            search_url = f"https://www.google.com/search?q={company_name}+financial+news&tbm=nws"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            
-            response = requests.get(search_url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find news article links
-            for a in soup.find_all('a'):
-                href = a.get('href', '')
-                if '/url?q=' in href:
-                    url = href.split('/url?q=')[1].split('&')[0]
-                    # Filter for reliable domains
-                    if any(domain in url for domain in general_domains):
-                        if url not in news_links:
-                            news_links.append(url)
+            # Query every search provider at once under a shared deadline
+            with time_stage("search"):
+                news_links, answered = self.search.search(f"{company_name} financial news", max_articles)
+            if not answered:
+                raise RuntimeError("no search provider answered before the deadline")
             
             # If we couldn't get enough links, add some from our financial sites list
             if len(news_links) < max_articles:
                 news_links.extend(financial_sites)
-                news_links = list(set(news_links))  # Remove duplicates
+                news_links = list(dict.fromkeys(news_links))  # Remove duplicates, keeping the ranking
             
             print(f"Found {len(news_links)} news links")
             return news_links[:max_articles]
             
         except Exception as e:
             print(f"Error searching for news: {e}")
+            record_error("search")
             # Return some mock article URLs in case of failure
             print("Using fallback news links")
             return self._get_mock_news_links(company_name)
     
+    def parse_search_links(self, html):
+        """Extract article links from reliable domains out of a search results page"""
+        return parse_anchor_links(html, GENERAL_NEWS_DOMAINS)
+    
     def _get_mock_news_links(self, company_name):
         """Provide mock news links when scraping fails"""
+        record_fallback("mock_news_links")
         return [
             f"https://www.reuters.com/companies/{company_name}",
             f"https://www.bloomberg.com/quote/{company_name}",
             f"https://www.cnbc.com/quotes/{company_name}"
         ]
     
-    def extract_article_content(self, url):
+    def extract_article_content(self, url, tier=None):
         """
         Extract article content using newspaper3k with better error handling
         """
         print(f"Extracting content from {url}")
         try:
-            article = Article(url)
-            article.download()
-            article.parse()
-            article.nlp()
-            
-            # Extract metadata
-            return {
-                "title": article.title or f"Article about {url.split('/')[2]}",
-                "summary": article.summary or "Summary not available",
-                "url": url,
-                "text": article.text or "Article text not available",
-                "keywords": article.keywords or [],
-                "publish_date": article.publish_date.strftime("%Y-%m-%d") if article.publish_date else None
-            }
+            # Fetch through the shared pooled session instead of a new connection
+            with time_stage("download"):
+                response = self.http_client.get(url, timeout=10)
+                response.raise_for_status()
+            return self.extract_from_html(url, response_html(response), tier)
         except Exception as e:
             print(f"Error extracting content from {url}: {e}")
+            record_error("extract")
             # Return mock data if extraction fails
             return self._get_mock_article_content(url)
     
+    def extract_from_html(self, url, html, tier=None):
+        """
+        Extract article content from downloaded HTML.
+        Tiers: "full" parses with newspaper3k and runs nlp() (summary and
+        keywords); "fast" skips newspaper3k and uses an lxml extractor with a
+        vectorized extractive summary.
+        """
+        tier = tier or self.extraction_tier
+        if tier == "fast":
+            with time_stage("parse"):
+                extracted = extract_main_text(html)
+            text = extracted["text"]
+            with time_stage("nlp"):
+                summary = summarize(text)
+                keywords = extract_keywords(text)
+            return {
+                "title": extracted["title"] or f"Article about {url.split('/')[2]}",
+                "summary": summary or "Summary not available",
+                "url": url,
+                "text": text or "Article text not available",
+                "keywords": keywords,
+                "publish_date": extracted["publish_date"]
+            }
+        
+        from newspaper import Article
+        self._ensure_nltk()
+        article = Article(url)
+        with time_stage("parse"):
+            article.download(input_html=html)
+            article.parse()
+        
+        # Extract metadata
+        with time_stage("nlp"):
+            article.nlp()
+        return {
+            "title": article.title or f"Article about {url.split('/')[2]}",
+            "summary": article.summary or "Summary not available",
+            "url": url,
+            "text": article.text or "Article text not available",
+            "keywords": article.keywords or [],
+            "publish_date": article.publish_date.strftime("%Y-%m-%d") if article.publish_date else None
+        }
+    
+    def _host_semaphore(self, url):
+        """Return the semaphore limiting concurrent fetches to the host of url"""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def _fetch_one(self, url):
+        """
+        Extract a single article under its per-host limit, never raising.
+        Known articles are read from the article store without any network work.
+        """
+        stored = self._load_stored_article(url)
+        if stored is not None:
+            return stored
+        try:
+            with self._host_semaphore(url):
+                data = self.extract_article_content(url)
+        except Exception as e:
+            print(f"Error fetching article {url}: {e}")
+            return None
+        if data and not data.get("is_mock"):
+            data["content_hash"] = content_hash(data["text"])
+            self._save_stored_article(url, data)
+        return data
+    
+    def _load_stored_article(self, url):
+        if self.article_store is None:
+            return None
+        try:
+            return self.article_store.get_article(url)
+        except Exception as e:
+            print(f"Error reading article store for {url}: {e}")
+            return None
+    
+    def _save_stored_article(self, url, data):
+        if self.article_store is None:
+            return
+        try:
+            self.article_store.put_article(url, data)
+        except Exception as e:
+            print(f"Error writing article store for {url}: {e}")
+    
+    def fetch_articles(self, urls):
+        """
+        Download and extract several articles concurrently.
+        Results are returned in the same order as urls; failed entries are None.
+        """
+        if not urls:
+            return []
+        return list(self._fetch_executor.map(self._fetch_one, urls))
+    
     def _get_mock_article_content(self, url):
         """Generate mock article content when extraction fails"""
+        record_fallback("mock_article_content")
         domain = url.split('/')[2] if '/' in url else url
         company = url.split('/')[-1] if '/' in url else "company"
         
@@ -151,154 +394,265 @@ class NewsScraper:
             The company has been focusing on innovation and market expansion.
             """,
             "keywords": ["finance", "market", "business", company],
-            "publish_date": None
+            "publish_date": None,
+            "is_mock": True
         }
     
     def analyze_sentiment(self, text):
         """
         Analyze sentiment of text with fallback mechanisms
         """
+        return self.score_sentiment_batch([text])[0]["sentiment"]
+    
+    def analyze_sentiment_batch(self, texts, batch_size=None):
+        """
+        Analyze sentiment of many texts with batched model calls.
+        Returns one sentiment label per text, in input order.
+        """
+        return [result["sentiment"] for result in self.score_sentiment_batch(texts, batch_size)]
+    
+    def score_sentiment_batch(self, texts, batch_size=None):
+        """
+        Score sentiment of many texts, returning {"sentiment", "score"} per text.
+        In long-document mode every text is split into overlapping token windows
+        and all windows of all texts share one batched pass; otherwise each text
+        is cut to the first 512 characters. Items the model cannot score fall
+        back to keyword analysis with a score of None.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        if not self.sentiment_analyzer:
+            return self._fallback_sentiment_results(texts)
+        
         try:
-            # Check if we have a valid analyzer
-            if not self.sentiment_analyzer:
-                return self._fallback_sentiment_analysis(text)
-            
-            # Use transformer pipeline if available
-            truncated_text = text[:512] if len(text) > 512 else text
-            result = self.sentiment_analyzer(truncated_text)[0]
-            label = result['label']
-            
-            # Convert model output to positive, negative, neutral
-            if label.upper() == "POSITIVE":
-                sentiment = "Positive"
-            elif label.upper() == "NEGATIVE":
-                sentiment = "Negative"
+            if self.long_document:
+                windows = [self._split_token_windows(text) for text in texts]
             else:
-                sentiment = "Neutral"
-                
-            return sentiment
+                windows = [[(text[:512], 1)] for text in texts]
         except Exception as e:
-            print(f"Error in sentiment analysis: {e}")
-            return self._fallback_sentiment_analysis(text)
+            print(f"Error splitting texts into windows: {e}")
+            windows = [[(text[:512], 1)] for text in texts]
+        
+        # Flatten windows so every text is scored in the same batched pass
+        flat = [window for text_windows in windows for window, _ in text_windows]
+        with time_stage("inference"):
+            predictions = self._predict_batched(flat, batch_size)
+        
+        results = []
+        failed = []
+        position = 0
+        for i, text_windows in enumerate(windows):
+            window_predictions = predictions[position:position + len(text_windows)]
+            position += len(text_windows)
+            scored = [(prediction, weight) for prediction, (_, weight) in zip(window_predictions, text_windows)
+                      if prediction is not None]
+            if scored:
+                results.append(self._aggregate_window_scores(scored))
+            else:
+                results.append(None)
+                failed.append(i)
+        
+        # Score everything the model could not handle in one keyword batch
+        for i, result in zip(failed, self._fallback_sentiment_results([texts[i] for i in failed])):
+            results[i] = result
+        return results
     
-    def _fallback_sentiment_analysis(self, text):
-        """Simple rule-based fallback for sentiment analysis"""
-        # Simple keyword-based approach
-        positive_words = ['increase', 'growth', 'profit', 'success', 'positive', 'up', 'gain', 'improved', 
-                         'higher', 'surge', 'advantage', 'opportunity', 'exceed', 'beat']
-        negative_words = ['decline', 'loss', 'trouble', 'fail', 'negative', 'down', 'decrease', 'reduced',
-                         'lower', 'drop', 'risk', 'concern', 'miss', 'problem']
+    def _predict_batched(self, texts, batch_size=None):
+        """
+        Run texts through the model in length-sorted chunks so each batch pads
+        to a similar length. Returns raw results in input order, None for any
+        item whose chunk failed.
+        """
+        batch_size = max(1, batch_size or self.batch_size)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        predictions = [None] * len(texts)
+        
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            try:
+                results = self.sentiment_analyzer([texts[i] for i in chunk], batch_size=len(chunk),
+                                                  truncation=True)
+                for i, result in zip(chunk, results):
+                    predictions[i] = result
+            except Exception as e:
+                print(f"Error in batched sentiment analysis: {e}")
+                record_error("inference")
+        
+        return predictions
+    
+    def _split_token_windows(self, text):
+        """
+        Split text on tokenizer boundaries into overlapping windows that fit the
+        model input, capped at max_windows. Returns (window_text, token_count) pairs.
+        """
+        tokenizer = getattr(self.sentiment_analyzer, "tokenizer", None)
+        if tokenizer is None or not getattr(tokenizer, "is_fast", False):
+            # Offsets need a fast tokenizer; fall back to the first 512 characters
+            return [(text[:512], 1)]
         
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        max_length = min(getattr(tokenizer, "model_max_length", 512) or 512, 512)
+        stride = min(self.window_overlap, max_length // 2)
+        encoding = tokenizer(text, truncation=True, max_length=max_length, stride=stride,
+                             return_overflowing_tokens=True, return_offsets_mapping=True)
         
-        if pos_count > neg_count + 1:  # Require stronger positive signal
+        windows = []
+        for offsets in encoding["offset_mapping"][:self.max_windows]:
+            # Special tokens map to empty (0, 0) spans
+            spans = [(start, end) for start, end in offsets if end > start]
+            if spans:
+                windows.append((text[spans[0][0]:spans[-1][1]], len(spans)))
+        return windows or [(text[:512], 1)]
+    
+    def _aggregate_window_scores(self, scored):
+        """
+        Combine window predictions into one article label and confidence.
+        Each window contributes its signed score weighted by token count.
+        """
+        total_weight = sum(weight for _, weight in scored)
+        signed = 0.0
+        for prediction, weight in scored:
+            sentiment = self._map_sentiment_label(prediction["label"])
+            direction = 1 if sentiment == "Positive" else -1 if sentiment == "Negative" else 0
+            signed += direction * float(prediction.get("score", 1.0)) * weight
+        signed /= total_weight
+        
+        if len(scored) == 1:
+            sentiment = self._map_sentiment_label(scored[0][0]["label"])
+        elif signed > self.neutral_margin:
+            sentiment = "Positive"
+        elif signed < -self.neutral_margin:
+            sentiment = "Negative"
+        else:
+            sentiment = "Neutral"
+        return {"sentiment": sentiment, "score": round(abs(signed), 4)}
+    
+    def _fallback_sentiment_results(self, texts):
+        """Keyword-based results used when the model cannot score texts"""
+        record_fallback("keyword_sentiment", len(texts))
+        return [{"sentiment": sentiment, "score": None} for sentiment in self.lexicon.classify_batch(texts)]
+    
+    def _map_sentiment_label(self, label):
+        """Convert model output to positive, negative, neutral"""
+        if label.upper() == "POSITIVE":
             return "Positive"
-        elif neg_count > pos_count + 1:  # Require stronger negative signal
+        elif label.upper() == "NEGATIVE":
             return "Negative"
         else:
             return "Neutral"
     
+    def _fallback_sentiment_analysis(self, text):
+        """Simple rule-based fallback for sentiment analysis"""
+        # Single-pass, word-boundary keyword matching
+        return self.lexicon.classify(text)
+    
     def extract_topics(self, text, keywords):
         """
         Extract key topics from article with better implementation
         """
-        try:
-            # Use keywords from newspaper3k and add any company-specific topics
-            topics = []
-            
-            # Common financial and business topics to look for
-            business_topics = [
-                "Stock Market", "Innovation", "Revenue", "Profit", "Loss",
-                "Investment", "Expansion", "Regulations", "Competition", 
-                "Product Launch", "Partnership", "Acquisition", "Layoffs",
-                "Sustainability", "Growth", "Technology", "Leadership",
-                "Electric Vehicles", "Autonomous Vehicles", "Renewable Energy"
-            ]
-            
-            # Add keywords as topics
-            if keywords:
-                topics.extend([k.title() for k in keywords[:3]])
-            
-            # Identify business topics in text
-            for topic in business_topics:
-                if topic.lower() in text.lower() and topic not in topics:
-                    topics.append(topic)
-                    
-            # Ensure we have at least 1-3 topics
-            if not topics:
-                # Choose random topics if none found
-                topics = random.sample(business_topics, min(3, len(business_topics)))
+        return self.extract_topics_batch([text], [keywords])[0]
+    
+    def extract_topics_batch(self, texts, keywords_list):
+        """
+        Extract key topics for many articles using the precompiled topic index
+        """
+        with time_stage("topics"):
+            matches = self.topic_index.match_batch(texts)
+        results = []
+        for matched, keywords in zip(matches, keywords_list):
+            try:
+                # Use keywords from newspaper3k and add any company-specific topics
+                topics = []
                 
-            return topics[:3]
-        except Exception as e:
-            print(f"Error extracting topics: {e}")
-            return ["Business", "Finance", "Markets"]
+                # Add keywords as topics
+                if keywords:
+                    topics.extend([k.title() for k in keywords[:3]])
+                
+                # Identify business topics in text
+                for topic in matched:
+                    if topic not in topics:
+                        topics.append(topic)
+                
+                # Ensure we have at least 1-3 topics
+                if not topics:
+                    # Choose random topics if none found
+                    taxonomy = self.topic_index.topics
+                    topics = random.sample(taxonomy, min(3, len(taxonomy)))
+                    record_fallback("random_topics")
+                
+                results.append(topics[:3])
+            except Exception as e:
+                print(f"Error extracting topics: {e}")
+                record_error("topics")
+                results.append(["Business", "Finance", "Markets"])
+        return results
     
     def perform_comparative_analysis(self, articles):
         """
         Perform comparative analysis across articles with improved approach
         """
         try:
-            # Make sure we have articles to analyze
-            if not articles:
-                return self._get_mock_comparative_analysis()
-            
-            # Count sentiment distribution
-            sentiment_counts = Counter([article["sentiment"] for article in articles])
-            
-            # Extract all topics
-            all_topics = []
-            for article in articles:
-                all_topics.extend(article["topics"])
-            
-            # Find common and unique topics
-            topic_counts = Counter(all_topics)
-            common_topics = [topic for topic, count in topic_counts.items() if count > 1]
-            unique_topics = list(set(all_topics) - set(common_topics))
-            
-            # Generate comparisons
-            comparisons = []
-            if len(articles) >= 2:
-                # Compare articles
-                for i in range(min(len(articles) - 1, 2)):  # Generate max 2 comparisons
-                    art1 = articles[i]
-                    art2 = articles[i + 1]
-                    
-                    comparison = {
-                        "comparison": f"Article {i+1} focuses on {', '.join(art1['topics'])}, while Article {i+2} covers {', '.join(art2['topics'])}.",
-                        "impact": self._generate_impact_statement(art1, art2)
-                    }
-                    comparisons.append(comparison)
-            else:
-                # Generate a placeholder comparison
-                comparisons.append({
-                    "comparison": "Limited coverage available for detailed comparison.",
-                    "impact": "More sources would provide a more comprehensive view of market sentiment."
-                })
-            
-            # Topic analysis
-            topic_overlap = {
-                "common_topics": common_topics,
-                "unique_topics": unique_topics
-            }
-            
-            # Generate final sentiment analysis
-            overall_sentiment = self._determine_overall_sentiment(sentiment_counts, articles)
-            
-            return {
-                "sentiment_distribution": dict(sentiment_counts),
-                "coverage_differences": comparisons,
-                "topic_overlap": topic_overlap,
-                "final_sentiment_analysis": overall_sentiment
-            }
+            with time_stage("comparative_analysis"):
+                # Make sure we have articles to analyze
+                if not articles:
+                    return self._get_mock_comparative_analysis()
+                
+                # Count sentiment distribution
+                sentiment_counts = Counter([article["sentiment"] for article in articles])
+                
+                # Extract all topics
+                all_topics = []
+                for article in articles:
+                    all_topics.extend(article["topics"])
+                
+                # Find common and unique topics
+                topic_counts = Counter(all_topics)
+                common_topics = [topic for topic, count in topic_counts.items() if count > 1]
+                unique_topics = list(set(all_topics) - set(common_topics))
+                
+                # Generate comparisons
+                comparisons = []
+                if len(articles) >= 2:
+                    # Compare articles
+                    for i in range(min(len(articles) - 1, 2)):  # Generate max 2 comparisons
+                        art1 = articles[i]
+                        art2 = articles[i + 1]
+                        
+                        comparison = {
+                            "comparison": f"Article {i+1} focuses on {', '.join(art1['topics'])}, while Article {i+2} covers {', '.join(art2['topics'])}.",
+                            "impact": self._generate_impact_statement(art1, art2)
+                        }
+                        comparisons.append(comparison)
+                else:
+                    # Generate a placeholder comparison
+                    comparisons.append({
+                        "comparison": "Limited coverage available for detailed comparison.",
+                        "impact": "More sources would provide a more comprehensive view of market sentiment."
+                    })
+                
+                # Topic analysis
+                topic_overlap = {
+                    "common_topics": common_topics,
+                    "unique_topics": unique_topics
+                }
+                
+                # Generate final sentiment analysis
+                overall_sentiment = self._determine_overall_sentiment(sentiment_counts, articles)
+                
+                return {
+                    "sentiment_distribution": dict(sentiment_counts),
+                    "coverage_differences": comparisons,
+                    "topic_overlap": topic_overlap,
+                    "final_sentiment_analysis": overall_sentiment
+                }
         except Exception as e:
             print(f"Error in comparative analysis: {e}")
+            record_error("comparative_analysis")
             return self._get_mock_comparative_analysis()
     
     def _get_mock_comparative_analysis(self):
         """Generate mock comparative analysis when real analysis fails"""
+        record_fallback("mock_comparative_analysis")
         return {
             "sentiment_distribution": {"Positive": 1, "Neutral": 1, "Negative": 1},
             "coverage_differences": [
@@ -362,87 +716,450 @@ class NewsScraper:
             print(f"Error determining overall sentiment: {e}")
             return "The news coverage shows mixed sentiment with no clear direction."
     
-    def text_to_hindi_speech(self, text, output_file="output.mp3"):
+    def text_to_hindi_speech(self, text, output_file=None):
         """
-        Convert text to Hindi speech with better implementation
+        Convert text to Hindi speech with better implementation.
+        Audio is served from the content-addressed audio store when the same
+        narration was synthesized before; the stored path is returned unless
+        output_file is given, in which case the audio is copied there.
         """
         try:
-            # Extract company name from text
-            company_name_match = re.search(r"Company: ([^.]+)", text)
-            company_name = company_name_match.group(1) if company_name_match else "कंपनी"
+            hindi_text = self.build_hindi_narration(text)
             
-            # Extract sentiment from text
-            sentiment_match = re.search(r"sentiment: ([^.]+)", text.lower())
-            sentiment = sentiment_match.group(1) if sentiment_match else ""
-            
-            # Map sentiment to Hindi
-            sentiment_hindi = "सकारात्मक" if "positive" in sentiment else \
-                             "नकारात्मक" if "negative" in sentiment else \
-                             "मिश्रित"
-            
-            # Create Hindi text (basic implementation)
-            hindi_text = f"{company_name} के लिए समाचार विश्लेषण {sentiment_hindi} है। हमने कई समाचार स्रोतों से जानकारी एकत्र की है।"
-            
-            # Generate TTS
-            tts = gTTS(text=hindi_text, lang='hi')
-            tts.save(output_file)
-            
-            return output_file
+            # Generate TTS, or reuse identical audio synthesized earlier
+            audio_file = self._synthesize_cached(hindi_text, 'hi')
         except Exception as e:
             print(f"Error in text_to_hindi_speech: {e}")
+            record_error("tts")
+            record_fallback("tts_error_audio")
             # Create a fallback audio file with error message
             try:
-                tts = gTTS(text="त्रुटि हुई है", lang='hi')
-                tts.save(output_file)
-            except:
+                audio_file = self._synthesize_cached("त्रुटि हुई है", 'hi')
+            except Exception:
                 # If even that fails, create an empty file
-                with open(output_file, 'wb') as f:
+                audio_file = os.path.join(self.audio_store.directory, f"empty.{self.audio_store.extension}")
+                with open(audio_file, 'wb') as f:
                     f.write(b'')
+        
+        if output_file:
+            shutil.copyfile(audio_file, output_file)
             return output_file
+        return audio_file
+    
+    def iter_hindi_speech(self, text):
+        """
+        Stream the Hindi narration of text as audio bytes. Chunks are
+        synthesized in parallel and each is yielded as soon as it and all
+        chunks before it are ready; the joined audio is stored afterwards.
+        """
+        hindi_text = self.build_hindi_narration(text)
+        key = self.audio_store.make_key(hindi_text, 'hi', self.tts_backend.name)
+        stored = self.audio_store.get(key)
+        if stored:
+            with open(stored, 'rb') as f:
+                yield from iter(lambda: f.read(64 * 1024), b'')
+            return
+        
+        parts = []
+        failed = 0
+        for future in self._submit_tts_chunks(hindi_text, 'hi'):
+            try:
+                part = future.result()
+            except Exception as e:
+                # Skip the chunk instead of cutting the response off mid-body
+                print(f"Error synthesizing TTS chunk: {e}")
+                record_error("tts")
+                failed += 1
+                continue
+            yield self.tts_backend.stream_part(part, first=not parts)
+            parts.append(part)
+        
+        if failed:
+            # Incomplete narrations are not stored
+            record_fallback("tts_chunks_skipped", failed)
+            if not parts:
+                record_fallback("tts_error_audio")
+                yield self.tts_backend.stream_part(self._synthesize_cached("त्रुटि हुई है", 'hi'), first=True)
+        elif len(parts) > 1:
+            self.audio_store.put(key, lambda path: self.tts_backend.concatenate(parts, path))
+    
+    def build_hindi_narration(self, text):
+        """Turn a TTS summary built by build_tts_summary into the Hindi narration"""
+        # Extract company name from text
+        company_name_match = re.search(r"Company: ([^.]+)", text)
+        company_name = company_name_match.group(1) if company_name_match else "कंपनी"
+        
+        # Extract sentiment from text
+        sentiment_match = re.search(r"sentiment: ([^.]+)", text.lower())
+        sentiment = sentiment_match.group(1) if sentiment_match else ""
+        
+        # Map sentiment to Hindi
+        sentiment_hindi = "सकारात्मक" if "positive" in sentiment else \
+                         "नकारात्मक" if "negative" in sentiment else \
+                         "मिश्रित"
+        
+        # Create Hindi text (basic implementation)
+        hindi_text = f"{company_name} के लिए समाचार विश्लेषण {sentiment_hindi} है। हमने कई समाचार स्रोतों से जानकारी एकत्र की है।"
+        
+        if self.narrate_articles:
+            # "Article N: title. summary" sections are read out as they are
+            sections = re.split(r"Article (\d+): ", text)[1:]
+            for number, body in zip(sections[::2], sections[1::2]):
+                if body.strip():
+                    hindi_text += f" लेख {number}: {body.strip()}"
+        return hindi_text
+    
+    def _synthesize_cached(self, text, lang):
+        """Return the stored audio path for text, synthesizing only on a miss"""
+        key = self.audio_store.make_key(text, lang, self.tts_backend.name)
+        
+        def synthesize(path):
+            if len(split_tts_chunks(text, self.tts_chunk_chars)) == 1:
+                with time_stage("tts"):
+                    self.tts_backend.synthesize(text, lang, path)
+            else:
+                self.tts_backend.concatenate([future.result() for future in self._submit_tts_chunks(text, lang)],
+                                             path)
+        
+        return self.audio_store.get_or_create(key, synthesize)
+    
+    def _submit_tts_chunks(self, text, lang):
+        """Start synthesizing the sentence chunks of text in parallel; returns futures in order"""
+        return [self._tts_executor.submit(self._synthesize_chunk, chunk, lang)
+                for chunk in split_tts_chunks(text, self.tts_chunk_chars)]
+    
+    def _synthesize_chunk(self, chunk, lang):
+        """Return the stored audio path of one chunk; repeated sentences are reused"""
+        key = self.audio_store.make_key(chunk, lang, self.tts_backend.name)
+        
+        def synthesize(path):
+            with time_stage("tts"):
+                self.tts_backend.synthesize(chunk, lang, path)
+        
+        return self.audio_store.get_or_create(key, synthesize)
+    
+    def build_tts_summary(self, result):
+        """Build the summary text narrated for a processed news result"""
+        summary_text = f"Company: {result['company']}. "
+        summary_text += f"Overall sentiment: {result['final_sentiment_analysis']} "
+        
+        # Add top 3 article summaries
+        for i, article in enumerate(result['articles'][:3]):
+            summary_text += f"Article {i+1}: {article['title']}. {article['summary']} "
+        
+        return summary_text
+    
+    def process_company_news(self, company_name, max_articles=5, use_cache=True, count_duplicates=None):
+        """
+        Process news for a company - main function that orchestrates everything.
+        Results are served from the shared result cache unless use_cache is False;
+        degraded (mock) results are never cached. count_duplicates chooses whether
+        every copy of a near-duplicate story counts toward the sentiment
+        distribution (default: the scraper's count_duplicates setting).
+        """
+        return self.process_companies([company_name], max_articles, use_cache, count_duplicates)[0]
+    
+    def process_companies(self, company_names, max_articles=5, use_cache=True, count_duplicates=None):
+        """
+        Process news for several companies in one pass.
+        Links are gathered for every company, URLs shared between companies are
+        fetched once and all articles are scored in a single batched inference
+        call. Returns one result per company, in input order.
+        """
+        if count_duplicates is None:
+            count_duplicates = self.count_duplicates
+        company_names = list(company_names)
+        results = [None] * len(company_names)
+        pending = []
+        for i, company_name in enumerate(company_names):
+            cache_key = self.result_cache.make_key(company_name, max_articles=max_articles,
+                                                   count_duplicates=count_duplicates)
+            if use_cache:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    print(f"Serving cached news analysis for {company_name}")
+                    record_response("cached")
+                    results[i] = cached
+                    continue
+            pending.append((i, company_name, cache_key))
+        
+        if pending:
+            with time_stage("pipeline"):
+                analyzed = self._analyze_companies([name for _, name, _ in pending], max_articles,
+                                                   count_duplicates)
+            for (i, _, cache_key), (output, degraded) in zip(pending, analyzed):
+                record_response("degraded" if degraded else "ok")
+                if not degraded:
+                    self.result_cache.set(cache_key, output)
+                results[i] = output
+        return results
     
-    def process_company_news(self, company_name):
+    def _search_all(self, company_names, max_articles=5):
+        """Search news links for several companies concurrently"""
+        workers = min(self.max_workers, len(company_names))
+        if workers <= 1:
+            return [self.search_news(name, max_articles) for name in company_names]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news-search") as executor:
+            return list(executor.map(lambda name: self.search_news(name, max_articles), company_names))
+    
+    def _analyze_companies(self, company_names, max_articles=5, count_duplicates=False):
         """
-        Process news for a company - main function that orchestrates everything
+        Run the full search, extraction and analysis pipeline for companies.
+        Returns (output, degraded) per company where degraded is True if mock data was used.
         """
-        print(f"Processing news for {company_name}...")
+        print(f"Processing news for {', '.join(company_names)}...")
         try:
             # Search for news articles
-            news_links = self.search_news(company_name)
+            link_lists = self._search_all(company_names, max_articles)
             
-            # Process each article
-            articles_data = []
-            for url in news_links:
-                try:
-                    article_data = self.extract_article_content(url)
-                    
-                    if article_data:
-                        # Analyze sentiment
-                        sentiment = self.analyze_sentiment(article_data["text"])
-                        
-                        # Extract topics
-                        topics = self.extract_topics(article_data["text"], article_data["keywords"])
-                        
-                        # Build article output structure
-                        article_output = {
-                            "title": article_data["title"],
-                            "summary": article_data["summary"],
-                            "sentiment": sentiment,
-                            "topics": topics,
-                            "url": url
-                        }
-                        
-                        articles_data.append(article_output)
-                except Exception as e:
-                    print(f"Error processing article {url}: {e}")
-                    # Continue to next article
+            # Download and extract every distinct URL once, concurrently
+            unique_urls = list(dict.fromkeys(url for links in link_lists for url in links))
+            extracted = dict(zip(unique_urls, self.fetch_articles(unique_urls)))
+            fetched = [(url, extracted[url]) for url in unique_urls if extracted[url]]
+            
+            # Score all articles in one batched inference call
+            processed = self._process_articles(fetched)
+            
+            return [self._build_company_output(company_name, links, extracted, processed, count_duplicates)
+                    for company_name, links in zip(company_names, link_lists)]
+        except Exception as e:
+            print(f"Error in process_company_news: {e}")
+            record_error("pipeline")
+            # Return mock data in case of complete failure
+            return [(self._generate_mock_company_news(name), True) for name in company_names]
+    
+    def analysis_version(self):
+        """
+        Identify everything that affects sentiment and topic results, so stored
+        analyses are only reused for the same model and settings
+        """
+        analyzer = self.sentiment_analyzer
+        if analyzer is None:
+            model = f"lexicon:{self.lexicon.fingerprint}"
+        else:
+            model = (getattr(getattr(analyzer, "model", None), "name_or_path", None)
+                     or getattr(analyzer, "model_id", None) or type(analyzer).__name__)
+            # Exported and quantized backends score slightly differently from fp32 PyTorch
+            backend = getattr(analyzer, "backend", self.inference_backend)
+            if backend != "pytorch":
+                model = f"{backend}:{model}"
+        settings = [model, self.long_document, self.max_windows, self.window_overlap,
+                    self.neutral_margin, self.topic_index.fingerprint, self.extraction_tier]
+        return hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()[:16]
+    
+    def _process_articles(self, fetched, dedup_index=None, earlier=None):
+        """
+        Score and tag extracted articles with one batched inference call.
+        Takes (url, article_data) pairs and returns {url: article_output}.
+        Analyses already in the article store for the same content and
+        analysis version are reused instead of running the model, and
+        near-duplicates of another article (in this call or, when streaming,
+        in the earlier outputs registered in dedup_index) share its analysis
+        and carry its URL as duplicate_of.
+        """
+        earlier = earlier or {}
+        duplicate_of = self._find_near_duplicates(fetched, dedup_index) if self.dedup else {}
+        version = self.analysis_version()
+        known = {}
+        if self.article_store is not None:
+            try:
+                known = self.article_store.get_analyses(
+                    [(url, data.get("content_hash") or content_hash(data["text"]))
+                     for url, data in fetched if not data.get("is_mock")], version)
+            except Exception as e:
+                print(f"Error reading stored analyses: {e}")
+        
+        # Only one article per near-duplicate cluster goes through the model
+        pending = [(url, data) for url, data in fetched if url not in known and url not in duplicate_of]
+        pending_urls = {url for url, _ in pending}
+        scores = self.score_sentiment_batch([data["text"] for _, data in pending])
+        topic_lists = self.extract_topics_batch([data["text"] for _, data in pending],
+                                                [data["keywords"] for _, data in pending])
+        for (url, _), score, topics in zip(pending, scores, topic_lists):
+            known[url] = {"sentiment": score["sentiment"], "sentiment_score": score["score"], "topics": topics}
+        for url, representative in duplicate_of.items():
+            if url not in known:
+                source = known.get(representative) or earlier[representative]
+                known[url] = {"sentiment": source["sentiment"], "sentiment_score": source["sentiment_score"],
+                              "topics": list(source["topics"])}
+        
+        # Keyword fallbacks for items the loaded model failed on must not be stored under its version
+        model_loaded = self.sentiment_analyzer is not None
+        
+        # Process each article
+        processed = {}
+        new_analyses = []
+        for url, article_data in fetched:
+            try:
+                analysis = known[url]
+                
+                # Build article output structure
+                processed[url] = {
+                    "title": article_data["title"],
+                    "summary": article_data["summary"],
+                    "sentiment": analysis["sentiment"],
+                    "sentiment_score": analysis["sentiment_score"],
+                    "topics": analysis["topics"],
+                    "url": url,
+                    "duplicate_of": duplicate_of.get(url)
+                }
+                if (url in pending_urls and not article_data.get("is_mock")
+                        and (analysis["sentiment_score"] is not None or not model_loaded)):
+                    new_analyses.append((url, article_data.get("content_hash") or content_hash(article_data["text"]),
+                                         analysis["sentiment"], analysis["sentiment_score"], analysis["topics"]))
+            except Exception as e:
+                print(f"Error processing article {url}: {e}")
+                record_error("process_article")
+                # Continue to next article
+        
+        if new_analyses and self.article_store is not None:
+            try:
+                self.article_store.put_analyses(new_analyses, version)
+            except Exception as e:
+                print(f"Error writing stored analyses: {e}")
+        return processed
+    
+    def _find_near_duplicates(self, fetched, dedup_index=None):
+        """Cluster real articles by SimHash; returns {url: representative_url} for the duplicates"""
+        index = dedup_index if dedup_index is not None else NearDuplicateIndex(self.dedup_max_distance)
+        duplicate_of = {}
+        for url, data in fetched:
+            if data.get("is_mock"):
+                continue
+            try:
+                fingerprint = simhash(data["text"])
+            except Exception as e:
+                print(f"Error fingerprinting article {url}: {e}")
+                continue
+            if fingerprint is None:
+                continue
+            representative = index.add(url, fingerprint)
+            if representative != url:
+                duplicate_of[url] = representative
+        record_near_duplicates(len(duplicate_of))
+        return duplicate_of
+    
+    def iter_company_news(self, company_name, max_articles=5, use_cache=True, count_duplicates=None):
+        """
+        Stream the analysis of a company's news as events.
+        Yields {"event": "article", ...} for each article as soon as it is
+        scored (articles finishing together are scored in one batch), then a
+        final {"event": "comparative_analysis", ...} event. Cluster sizes are
+        only known at the end, so the final event repeats the articles with
+        their cluster_size and duplicate_of filled in.
+        """
+        if count_duplicates is None:
+            count_duplicates = self.count_duplicates
+        cache_key = self.result_cache.make_key(company_name, max_articles=max_articles,
+                                               count_duplicates=count_duplicates)
+        output = self.result_cache.get(cache_key) if use_cache else None
+        if output is not None:
+            print(f"Serving cached news analysis for {company_name}")
+            record_response("cached")
+            for index, article in enumerate(output["articles"]):
+                yield {"event": "article", "index": index, "article": article}
+        else:
+            # Latency as the client sees it, from the search to the last article
+            with time_stage("pipeline"):
+                output, degraded = yield from self._stream_company_articles(company_name, max_articles,
+                                                                            count_duplicates)
+            record_response("degraded" if degraded else "ok")
+            if not degraded:
+                self.result_cache.set(cache_key, output)
+        
+        yield {
+            "event": "comparative_analysis",
+            "company": output["company"],
+            "articles": output["articles"],
+            "comparative_sentiment_score": output["comparative_sentiment_score"],
+            "final_sentiment_analysis": output["final_sentiment_analysis"]
+        }
+    
+    def _stream_company_articles(self, company_name, max_articles=5, count_duplicates=False):
+        """
+        Fetch and score articles as they complete, yielding article events.
+        Returns (output, degraded) like _analyze_companies once all are done.
+        """
+        print(f"Streaming news for {company_name}...")
+        news_links = list(dict.fromkeys(self.search_news(company_name, max_articles)))
+        extracted = {}
+        processed = {}
+        emitted = 0
+        # Shared across batches so a late copy of an already streamed story reuses its analysis
+        dedup_index = NearDuplicateIndex(self.dedup_max_distance)
+        
+        pending = {self._fetch_executor.submit(self._fetch_one, url): url for url in news_links}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                fetched = []
+                for future in done:
+                    url = pending.pop(future)
+                    extracted[url] = future.result()
+                    if extracted[url]:
+                        fetched.append((url, extracted[url]))
+                
+                # Score everything that finished together in one batch
+                for url, article in self._process_articles(fetched, dedup_index, processed).items():
+                    processed[url] = article
+                    yield {"event": "article", "index": emitted, "article": article}
+                    emitted += 1
+        finally:
+            # A client that stops reading leaves its queued downloads unstarted
+            for future in pending:
+                future.cancel()
+        
+        output, degraded = self._build_company_output(company_name, news_links, extracted, processed,
+                                                      count_duplicates)
+        
+        if not processed:
+            # Mock articles are only known once the build step falls back to them
+            for index, article in enumerate(output["articles"]):
+                yield {"event": "article", "index": index, "article": article}
+        return output, degraded
+    
+    def _build_company_output(self, company_name, news_links, extracted, processed, count_duplicates=False):
+        """
+        Assemble one company's result from the shared per-URL analysis.
+        Near-duplicates are grouped into clusters: every article carries its
+        cluster_size, and all but the first of a cluster carry duplicate_of.
+        Unless count_duplicates is set, only the first of each cluster counts
+        toward the sentiment distribution and the history.
+        """
+        try:
+            links = list(dict.fromkeys(news_links))
+            articles_data = [dict(processed[url], topics=list(processed[url]["topics"]))
+                             for url in links if url in processed]
+            
+            # Results built only from mock article content, or only from keyword
+            # fallbacks because the loaded model failed, are degraded
+            model_loaded = self._sentiment_analyzer is not None
+            degraded = all(extracted[url].get("is_mock") or (model_loaded and processed[url]["sentiment_score"] is None)
+                           for url in links if url in processed)
+            
+            # A cluster is keyed by the article it was deduplicated against, which leads
+            # it; in a multi-company batch that may belong to another company, and then
+            # the first copy here leads it instead
+            clusters = {}
+            for article in articles_data:
+                clusters.setdefault(article.get("duplicate_of") or article["url"], []).append(article)
+            for key, members in clusters.items():
+                lead = next((article for article in members if article["url"] == key), members[0])
+                for article in members:
+                    article["cluster_size"] = len(members)
+                    article["duplicate_of"] = None if article is lead else lead["url"]
+            counted = articles_data if count_duplicates else [a for a in articles_data if not a["duplicate_of"]]
+            
+            # Real articles feed the sentiment history
+            self._record_history(company_name, [a["url"] for a in counted], extracted, processed)
             
             # Ensure we have at least some data
             if not articles_data:
                 print("Warning: No articles data found. Using mock data.")
-                articles_data = self._generate_mock_articles(company_name)
+                articles_data = counted = self._generate_mock_articles(company_name)
             
             # Perform comparative analysis
-            comparative_analysis = self.perform_comparative_analysis(articles_data)
+            comparative_analysis = self.perform_comparative_analysis(counted)
             
             # Create final output
             output = {
@@ -452,14 +1169,29 @@ class NewsScraper:
                 "final_sentiment_analysis": comparative_analysis["final_sentiment_analysis"]
             }
             
-            return output
+            return output, degraded
         except Exception as e:
             print(f"Error in process_company_news: {e}")
+            record_error("pipeline")
             # Return mock data in case of complete failure
-            return self._generate_mock_company_news(company_name)
+            return self._generate_mock_company_news(company_name), True
+    
+    def _record_history(self, company_name, links, extracted, processed):
+        """Append a company's analyzed, non-mock articles to the sentiment history"""
+        if self.history is None:
+            return
+        articles = [dict(processed[url], publish_date=extracted[url].get("publish_date"))
+                    for url in links if url in processed and not extracted[url].get("is_mock")]
+        if not articles:
+            return
+        try:
+            self.history.record(company_name, articles)
+        except Exception as e:
+            print(f"Error recording sentiment history: {e}")
     
     def _generate_mock_articles(self, company_name):
         """Generate mock articles when scraping fails"""
+        record_fallback("mock_articles")
         # Create different sentiment patterns for different companies to avoid the "balanced" issue
         company_lower = company_name.lower()
         
@@ -516,6 +1248,7 @@ class NewsScraper:
     
     def _generate_mock_company_news(self, company_name):
         """Generate complete mock news analysis"""
+        record_fallback("mock_company_news")
         articles = self._generate_mock_articles(company_name)
         
         # Count sentiments
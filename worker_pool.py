@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Worker pool defaults, overridable from the environment
+POOL_WORKERS = int(os.environ.get("NEWS_API_WORKERS", 4))
+POOL_QUEUE_SIZE = int(os.environ.get("NEWS_API_QUEUE_SIZE", 16))
+POOL_RETRY_AFTER_SECONDS = int(os.environ.get("NEWS_API_RETRY_AFTER", 5))
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the worker pool and its admission queue are full"""
+
+    def __init__(self, retry_after=POOL_RETRY_AFTER_SECONDS):
+        super().__init__("Server is busy, please retry later")
+        self.retry_after = retry_after
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool for blocking pipeline work with a bounded admission queue.
+    At most workers jobs run at once and at most queue_size more wait; further
+    submissions are rejected immediately with PoolSaturatedError.
+    """
+
+    def __init__(self, workers=POOL_WORKERS, queue_size=POOL_QUEUE_SIZE,
+                 retry_after=POOL_RETRY_AFTER_SECONDS, name="news-worker"):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit fn to the pool, raising PoolSaturatedError if no slot is free"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturatedError(self.retry_after)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        """Return running/queued job counts and the number of rejections"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()